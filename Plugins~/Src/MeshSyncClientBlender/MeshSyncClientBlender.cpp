@@ -187,6 +187,12 @@ PYBIND11_MODULE(MeshSyncClientBlender, m)
                     self->onDepsgraphUpdatedPost(graph);
                 })
             BindMethod(resetMaterials, [](self_t& self) { self->resetMaterials(); })
+            BindMethod(addBakedImage, [](self_t& self, const std::string& name, uintptr_t image, int width, int height, py::buffer pixels) {
+                    py::buffer_info info = pixels.request();
+                    self->addBakedImage(name, (const Image*)image, width, height, info.ptr, info.size * info.itemsize);
+                })
+            BindMethod(removeBakedImage, [](self_t& self, const std::string& name) { self->removeBakedImage(name); })
+            BindMethod(clearBakedImages, [](self_t& self) { self->clearBakedImages(); })
 
             BindMethod(sendEditorCommand, [](self_t& self, int command, const char* input = nullptr) {
                     self->sendEditorCommand((ms::EditorCommandMessage::CommandType) command, input);
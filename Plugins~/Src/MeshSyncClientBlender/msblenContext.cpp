@@ -1453,6 +1453,7 @@ void msblenContext::clear()
     m_texture_manager.clear();
     m_material_manager.clear();
     m_entity_manager.clear();
+    clearBakedImages();
 }
 
 void msblenContext::resetMaterials()
@@ -1461,6 +1462,25 @@ void msblenContext::resetMaterials()
     m_material_manager.clear();
 }
 
+void msblenContext::addBakedImage(const std::string& name, const Image* image, int width, int height, const void* data, size_t size)
+{
+    auto& pixels = m_materialsHelper.m_baked_images[name];
+    pixels.image = image;
+    pixels.width = width;
+    pixels.height = height;
+    pixels.data.assign((const char*)data, (const char*)data + size);
+}
+
+void msblenContext::removeBakedImage(const std::string& name)
+{
+    m_materialsHelper.m_baked_images.erase(name);
+}
+
+void msblenContext::clearBakedImages()
+{
+    m_materialsHelper.m_baked_images.clear();
+}
+
 bool msblenContext::prepare()
 {
     if (!bl::ready())
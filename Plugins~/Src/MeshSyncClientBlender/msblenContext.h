@@ -67,6 +67,9 @@ public:
     bool prepare();
 
     void resetMaterials();
+    void addBakedImage(const std::string& name, const Image* image, int width, int height, const void* data, size_t size);
+    void removeBakedImage(const std::string& name);
+    void clearBakedImages();
 
     bool sendMaterials(bool dirty_all);
     bool sendObjects(MeshSyncClient::ObjectScope scope, bool dirty_all);
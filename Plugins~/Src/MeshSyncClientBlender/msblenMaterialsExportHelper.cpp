@@ -28,6 +28,9 @@ const auto scaleIdentifier = "Scale";
 
 // This is the name of the image AO is baked to. It's not connected to the BSDF or material output:
 const auto bakedAOImageName = "BAKED_AO";
+// Name of the image AO, roughness and metallic are packed into (R: AO, G: roughness, B: metallic).
+// Roughness and metallic are connected to the BSDF through a separate color node:
+const auto bakedORMImageName = "BAKED_ORM";
 
 
 // Moves upstream to find input nodes, passing through reroutes.
@@ -47,6 +50,28 @@ bNode* traverseReroutes(bNode* node, const Material* mat) {
 	return nullptr;
 }
 
+// Index of the output socket the input socket is connected to, passing through reroutes:
+int getLinkedOutputIndex(bNodeSocket* socket) {
+	auto link = socket->link;
+	while (link && link->fromnode->type == NODE_REROUTE) {
+		link = ((bNodeSocket*)link->fromnode->inputs.first)->link;
+	}
+
+	if (!link) {
+		return -1;
+	}
+
+	int index = 0;
+	for (auto outputSocket : list_range((bNodeSocket*)link->fromnode->outputs.first)) {
+		if (outputSocket == link->fromsock) {
+			return index;
+		}
+		++index;
+	}
+
+	return -1;
+}
+
 bNodeSocket* getInputSocket(bNode* node, const char* socketName) {
 	for (auto inputSocket : list_range((bNodeSocket*)node->inputs.first)) {
 		if (STREQ(inputSocket->name, socketName)) {
@@ -148,6 +173,57 @@ int msblenMaterialsExportHelper::exportTexture(const std::string& path, ms::Text
 	return m_texture_manager->addFile(path, type);
 }
 
+bool msblenMaterialsExportHelper::exportBakedImage(ms::TextureType& textureType,
+	std::function<void(int textureId)> setTextureHandler,
+	Image* img) const
+{
+	std::string imageName = img->id.name + 2; // Remove blender's IM prefix
+
+	auto it = m_baked_images.find(imageName);
+	if (it == m_baked_images.end() || it->second.image != img) {
+		return false;
+	}
+
+	auto& pixels = it->second;
+	int exported = m_texture_manager->addImage(imageName, pixels.width, pixels.height, pixels.data.data(), pixels.data.size(), ms::TextureFormat::RGBAu8, textureType);
+	setTextureHandler(exported);
+	return true;
+}
+
+bool msblenMaterialsExportHelper::exportBakedImageChannel(ms::TextureType textureType,
+	std::function<void(int textureId)> setTextureHandler,
+	Image* img,
+	int channel) const
+{
+	if (channel < 0 || channel > 3) {
+		return false;
+	}
+
+	std::string imageName = img->id.name + 2; // Remove blender's IM prefix
+
+	auto it = m_baked_images.find(imageName);
+	if (it == m_baked_images.end() || it->second.image != img) {
+		return false;
+	}
+
+	// Unity can't pick a channel of a texture, send the channel as a grayscale texture:
+	auto& pixels = it->second;
+	size_t numPixels = (size_t)pixels.width * pixels.height;
+	std::vector<char> channelData(numPixels * 4);
+	for (size_t i = 0; i < numPixels; ++i) {
+		char value = pixels.data[i * 4 + channel];
+		channelData[i * 4 + 0] = value;
+		channelData[i * 4 + 1] = value;
+		channelData[i * 4 + 2] = value;
+		channelData[i * 4 + 3] = (char)255;
+	}
+
+	std::string channelName = imageName + "_" + "RGBA"[channel];
+	int exported = m_texture_manager->addImage(channelName, pixels.width, pixels.height, channelData.data(), channelData.size(), ms::TextureFormat::RGBAu8, textureType);
+	setTextureHandler(exported);
+	return true;
+}
+
 void msblenMaterialsExportHelper::exportPackedImages(ms::TextureType& textureType,
 	std::function<void(int textureId)> setTextureHandler,
 	Image* img) const
@@ -196,6 +272,11 @@ void msblenMaterialsExportHelper::exportImageFromImageNode(ms::TextureType& text
 		textureType = ms::TextureType::NonColor;
 	}
 
+	// Baked images can be sent from memory without reading their file:
+	if (exportBakedImage(textureType, setTextureHandler, img)) {
+		return;
+	}
+
 	// Unpack if needed:
 	if (img->packedfiles.first) {
 		exportPackedImages(textureType, setTextureHandler, img);
@@ -320,6 +401,48 @@ void msblenMaterialsExportHelper::handlePassthrough(const Material* mat,
 		setTextureHandler);
 }
 
+void msblenMaterialsExportHelper::handleSeparateColorNode(const Material* mat,
+	ms::TextureType textureType,
+	bool resetIfInputIsTexture,
+	std::function<void(const mu::float4& colorValue)> setColorHandler,
+	std::function<void(int textureId)> setTextureHandler,
+	bNode* sourceNode,
+	int channel)
+{
+	// The input is called 'Color' or 'Image' depending on the blender version:
+	auto imageInput = (bNodeSocket*)sourceNode->inputs.first;
+	if (!imageInput)
+		return;
+
+	// Baked packed textures are in memory, only the used channel can be sent:
+	if (setTextureHandler && imageInput->link) {
+		auto imageNode = traverseReroutes(imageInput->link->fromnode, mat);
+		if (imageNode && !(imageNode->flag & NODE_MUTED) && imageNode->type == SH_NODE_TEX_IMAGE && imageNode->id) {
+			if (exportBakedImageChannel(textureType, setTextureHandler, (Image*)imageNode->id, channel)) {
+				if (resetIfInputIsTexture && setColorHandler) {
+					setColorHandler(mu::float4{ 1, 1, 1, 1 });
+				}
+				return;
+			}
+
+			// The python side registers the pixels of baked ORM textures. If they are missing, sending the packed
+			// texture would use all its channels, send no texture instead:
+			if (STREQ(imageNode->name, bakedORMImageName)) {
+				setTextureHandler(ms::InvalidID);
+				return;
+			}
+		}
+	}
+
+	// Otherwise send the whole image:
+
+	setValueFromSocket(mat,
+		imageInput, textureType,
+		resetIfInputIsTexture,
+		setColorHandler,
+		setTextureHandler);
+}
+
 void msblenMaterialsExportHelper::handleSocketValue(bNodeSocket* socket,
 	std::function<void(const mu::float4& colorValue)> setColorHandler,
 	std::function<void(int textureId)> setTextureHandler)
@@ -407,6 +530,17 @@ void msblenMaterialsExportHelper::setValueFromSocket(const Material* mat,
 		handlePassthrough(mat, textureType, resetIfInputIsTexture, setColorHandler, setTextureHandler, sourceNode);
 		break;
 	}
+	// Packed textures use one channel of the image:
+#if BLENDER_VERSION >= 303
+	case SH_NODE_SEPARATE_COLOR:
+#else
+	case SH_NODE_SEPRGB:
+#endif
+	{
+		handleSeparateColorNode(mat, textureType, resetIfInputIsTexture, setColorHandler, setTextureHandler, sourceNode,
+			getLinkedOutputIndex(socket));
+		break;
+	}
 	}
 }
 
@@ -540,20 +674,28 @@ void msblenMaterialsExportHelper::setPropertiesFromBSDF(const Material* mat, ms:
 
 void msblenMaterialsExportHelper::setAmbientOcclusion(const Material* mat, ms::StandardMaterial& stdmat)
 {
-	// Checks if there is an image node called 'BAKED_AO' and if there is, it sends its image as AO:
+	// Checks if there is an image node called 'BAKED_AO' or 'BAKED_ORM' and if there is, it sends its image as AO:
 	auto tree = mat->nodetree;
 	for (auto node : list_range((bNode*)tree->nodes.first)) {
 		if(node->type == SH_NODE_TEX_IMAGE)
 		{
-		    if(STREQ(node->name, bakedAOImageName))
+		    if(STREQ(node->name, bakedAOImageName) || STREQ(node->name, bakedORMImageName))
 		    {
                 ms::TextureType textureType = ms::TextureType::NonColor;
-				exportImageFromImageNode(textureType,
-					[&](int textureId)
+				auto setOcclusionMap = [&](int textureId)
 					{
 						stdmat.setOcclusionMap(textureId);
-					},
-					node);
+					};
+
+				// AO is in the red channel of the ORM texture, it can't be sent without its pixels:
+				if (STREQ(node->name, bakedORMImageName)) {
+					if (node->id) {
+						exportBakedImageChannel(textureType, setOcclusionMap, (Image*)node->id, 0);
+					}
+					continue;
+				}
+
+				exportImageFromImageNode(textureType, setOcclusionMap, node);
 			
 		    }
 		}
@@ -6,6 +6,15 @@
 #include "MeshSyncClient/msTextureManager.h"
 
 namespace blender {
+// Pixels of a baked image that are sent without saving the image to a file first:
+struct BakedImagePixels
+{
+	const Image* image = nullptr; // The image the pixels were read from, names can be reused by other images
+	int width = 0;
+	int height = 0;
+	std::vector<char> data; // RGBA, 8 bits per channel
+};
+
 class msblenMaterialsExportHelper
 {
 	void setValueFromSocket(const Material* mat,
@@ -22,6 +31,10 @@ class msblenMaterialsExportHelper
 	void exportMaterialFromNodeTree(const Material* mat, ms::StandardMaterial& stdmat);
 
 	int exportTexture(const std::string& path, ms::TextureType type) const;
+	bool exportBakedImage(ms::TextureType& textureType, std::function<void(int textureId)> setTextureHandler,
+	                      Image* img) const;
+	bool exportBakedImageChannel(ms::TextureType textureType, std::function<void(int textureId)> setTextureHandler,
+	                             Image* img, int channel) const;
 	void exportPackedImages(ms::TextureType& textureType, std::function<void(int textureId)> setTextureHandler,
 	                        Image* img) const;
 	void exportImageFromImageNode(ms::TextureType& textureType, std::function<void(int textureId)> setTextureHandler,
@@ -43,6 +56,9 @@ class msblenMaterialsExportHelper
 	void handlePassthrough(const Material* mat, ms::TextureType textureType, bool resetIfInputIsTexture,
 		std::function<void(const mu::float4& colorValue)> setColorHandler,
 		std::function<void(int textureId)> setTextureHandler, bNode* sourceNode);
+	void handleSeparateColorNode(const Material* mat, ms::TextureType textureType, bool resetIfInputIsTexture,
+		std::function<void(const mu::float4& colorValue)> setColorHandler,
+		std::function<void(int textureId)> setTextureHandler, bNode* sourceNode, int channel);
 	void handleSocketValue(bNodeSocket* socket,
 		std::function<void(const mu::float4& colorValue)> setColorHandler,
 		std::function<void(int textureId)> setTextureHandler);
@@ -53,6 +69,9 @@ public:
 	BlenderSyncSettings* m_settings;
 	ms::TextureManager* m_texture_manager;
 
+	// Baked images by their blender name:
+	std::map<std::string, BakedImagePixels> m_baked_images;
+
 	void exportMaterial(const Material* mat, std::shared_ptr<ms::Material> ret);
 };
 }
@@ -350,12 +350,16 @@ def register():
         bpy.utils.register_class(c)
     msb_initialize_properties()
     bpy.app.handlers.load_post.append(msb_setBakingDefaults)
+    bpy.app.handlers.depsgraph_update_post.append(msb_trackBakeModifications)
+    bpy.app.handlers.save_pre.append(msb_useWrittenBakedImageFiles)
 
 def unregister():
     msb_context.Destroy()
     for c in classes:
         bpy.utils.unregister_class(c)
     bpy.app.handlers.load_post.remove(msb_setBakingDefaults)
+    bpy.app.handlers.depsgraph_update_post.remove(msb_trackBakeModifications)
+    bpy.app.handlers.save_pre.remove(msb_useWrittenBakedImageFiles)
 
 def DestroyMeshSyncContext():
     msb_context.Destroy()
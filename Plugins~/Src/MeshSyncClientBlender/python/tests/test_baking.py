@@ -0,0 +1,127 @@
+'''
+Tests for the baking module that need blender. Run them with the MeshSync add-on installed:
+blender -b --python-exit-code 1 --python test_baking.py
+'''
+import sys
+import unittest
+
+import bpy
+import MeshSyncClientBlender.unity_mesh_sync_baking as baking
+
+
+def createGroupOutput(group, socketType, name):
+    # The group interface API changed in blender 4.0:
+    if hasattr(group, "interface"):
+        group.interface.new_socket(name, in_out='OUTPUT', socket_type=socketType)
+    else:
+        group.outputs.new(socketType, name)
+
+
+class InlineNodeGroupsTest(unittest.TestCase):
+    def setUp(self):
+        self.group = bpy.data.node_groups.new("MeshSyncTestGroup", 'ShaderNodeTree')
+        self.image = bpy.data.images.new("MeshSyncTestImage", 4, 4)
+        self.material = bpy.data.materials.new("MeshSyncTestMaterial")
+        self.material.use_nodes = True
+
+    def tearDown(self):
+        bpy.data.materials.remove(self.material)
+        bpy.data.node_groups.remove(self.group)
+        bpy.data.images.remove(self.image)
+
+    def createGroup(self):
+        nodes = self.group.nodes
+        links = self.group.links
+
+        groupOutput = nodes.new('NodeGroupOutput')
+        createGroupOutput(self.group, 'NodeSocketFloat', "Value")
+        createGroupOutput(self.group, 'NodeSocketColor', "Color")
+        createGroupOutput(self.group, 'NodeSocketColor', "Image")
+        createGroupOutput(self.group, 'NodeSocketColor', "Ramp")
+
+        value = nodes.new('ShaderNodeValue')
+        value.outputs[0].default_value = 0.37
+        links.new(value.outputs[0], groupOutput.inputs[0])
+
+        rgb = nodes.new('ShaderNodeRGB')
+        rgb.outputs[0].default_value = (0.1, 0.2, 0.3, 1.0)
+        links.new(rgb.outputs[0], groupOutput.inputs[1])
+
+        image = nodes.new('ShaderNodeTexImage')
+        image.image = self.image
+        image.interpolation = 'Closest'
+        image.image_user.frame_offset = 5
+        image.image_user.use_cyclic = True
+        image.texture_mapping.translation = (1.0, 2.0, 3.0)
+        image.texture_mapping.rotation = (0.5, 0.0, 0.0)
+        image.color_mapping.brightness = 1.5
+        image.color_mapping.use_color_ramp = True
+        image.color_mapping.color_ramp.elements[0].position = 0.25
+        links.new(image.outputs[0], groupOutput.inputs[2])
+
+        ramp = nodes.new('ShaderNodeValToRGB')
+        ramp.color_ramp.interpolation = 'CONSTANT'
+        ramp.color_ramp.elements.new(0.6).color = (1.0, 0.0, 0.0, 1.0)
+        ramp.inputs[0].default_value = 0.8
+        links.new(ramp.outputs[0], groupOutput.inputs[3])
+
+        return {"value": value, "rgb": rgb, "image": image, "ramp": ramp}
+
+    def inlineGroup(self):
+        node_tree = self.material.node_tree
+        groupNode = node_tree.nodes.new('ShaderNodeGroup')
+        groupNode.node_tree = self.group
+
+        # Only connected outputs are followed, use all of them:
+        bsdf = node_tree.nodes["Principled BSDF"]
+        node_tree.links.new(groupNode.outputs[0], bsdf.inputs["Roughness"])
+        node_tree.links.new(groupNode.outputs[1], bsdf.inputs["Base Color"])
+        node_tree.links.new(groupNode.outputs[2], bsdf.inputs["Emission"])
+        node_tree.links.new(groupNode.outputs[3], bsdf.inputs["Subsurface Color"])
+
+        baking.msb_inlineNodeGroups(node_tree)
+        self.assertFalse(any(node.type == 'GROUP' for node in node_tree.nodes))
+
+        return {node.bl_idname: node for node in node_tree.nodes}
+
+    def assertSequenceAlmostEqual(self, first, second):
+        self.assertEqual(len(first), len(second))
+        for a, b in zip(first, second):
+            self.assertAlmostEqual(a, b, places=5)
+
+    def test_inlined_nodes_keep_their_values(self):
+        original = self.createGroup()
+        inlined = self.inlineGroup()
+
+        self.assertAlmostEqual(inlined['ShaderNodeValue'].outputs[0].default_value,
+                               original["value"].outputs[0].default_value, places=5)
+        self.assertSequenceAlmostEqual(inlined['ShaderNodeRGB'].outputs[0].default_value,
+                                       original["rgb"].outputs[0].default_value)
+
+        image, originalImage = inlined['ShaderNodeTexImage'], original["image"]
+        self.assertEqual(image.image, originalImage.image)
+        self.assertEqual(image.interpolation, originalImage.interpolation)
+        self.assertEqual(image.image_user.frame_offset, originalImage.image_user.frame_offset)
+        self.assertEqual(image.image_user.use_cyclic, originalImage.image_user.use_cyclic)
+        self.assertSequenceAlmostEqual(image.texture_mapping.translation, originalImage.texture_mapping.translation)
+        self.assertSequenceAlmostEqual(image.texture_mapping.rotation, originalImage.texture_mapping.rotation)
+        self.assertAlmostEqual(image.color_mapping.brightness, originalImage.color_mapping.brightness, places=5)
+        self.assertEqual(image.color_mapping.use_color_ramp, originalImage.color_mapping.use_color_ramp)
+        self.assertAlmostEqual(image.color_mapping.color_ramp.elements[0].position,
+                               originalImage.color_mapping.color_ramp.elements[0].position, places=5)
+
+        ramp, originalRamp = inlined['ShaderNodeValToRGB'], original["ramp"]
+        self.assertEqual(ramp.color_ramp.interpolation, originalRamp.color_ramp.interpolation)
+        self.assertEqual(len(ramp.color_ramp.elements), len(originalRamp.color_ramp.elements))
+        for element, originalElement in zip(ramp.color_ramp.elements, originalRamp.color_ramp.elements):
+            self.assertAlmostEqual(element.position, originalElement.position, places=5)
+            self.assertSequenceAlmostEqual(element.color, originalElement.color)
+        self.assertAlmostEqual(ramp.inputs[0].default_value, originalRamp.inputs[0].default_value, places=5)
+
+
+if __name__ == "__main__":
+    # Blender's own arguments are not for unittest:
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv=argv, exit=False).result
+    if not result.wasSuccessful():
+        sys.exit(1)
@@ -2,7 +2,21 @@ import bpy, os, datetime, time, math
 from bpy_extras.io_utils import ExportHelper
 from bpy.app.handlers import persistent
 import functools
+import itertools
 import tempfile
+import json
+import shutil
+import subprocess
+import hashlib
+import sys
+import argparse
+import logging
+import contextlib
+import threading
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from . import MeshSyncClientBlender as ms
 
 from .unity_mesh_sync_common import MESHSYNC_PT
 
@@ -45,10 +59,217 @@ channelNameToBakeName = {
     AO_CHANNEL_NAME: 'AO'
 }
 
+# Channels with a single value that can be packed into the colour channels of one emission bake:
+SCALAR_CHANNELS = ["Metallic",
+                   "Roughness",
+                   "Clearcoat",
+                   DISPLACEMENT_CHANNEL_NAME]
 
-def msb_log(text, level=LogLevel.VERBOSE):
-    if level >= showLogLevel:
-        print(text)
+# Emission bakes only write RGB, so this is how many scalar channels fit in one bake:
+MAX_PACKED_CHANNELS = 3
+
+# Seconds of bake steps to run per modal update before blender gets to handle events and redraw:
+MODAL_TIME_BUDGET = 0.05
+# Yielded by bake tasks before a step that runs a cycles bake, so it starts in a new modal update:
+BAKE_STEP = "BAKE"
+# Yielded by bake tasks when the UI should be redrawn before continuing:
+REDRAW_STEP = "REDRAW"
+# Lines at the end of a failed bake process's output that are logged:
+WORKER_LOG_LINES = 50
+
+# Names of image nodes that are not connected to the baked BSDF directly, the exporter looks for these:
+BAKED_AO_IMAGE_NODE_NAME = "BAKED_AO"
+BAKED_ORM_IMAGE_NODE_NAME = "BAKED_ORM"
+
+# Channels that can be packed into one ORM texture, in RGB order:
+ORM_CHANNELS = [AO_CHANNEL_NAME,
+                "Roughness",
+                "Metallic"]
+
+# UVs can be this far outside the 0..1 range and still be used for baking:
+UV_BOUNDS_TOLERANCE = 0.00005
+
+# File in the baked texture folder that stores which inputs the baked textures were made from:
+BAKE_CACHE_FILE_NAME = "meshsync_bake_cache.json"
+# Increase this when the bake output changes so existing cache entries are not used anymore:
+BAKE_CACHE_VERSION = 1
+
+# File in blender's config folder with measured bake durations, shared by all blend files:
+BAKE_HISTORY_FILE_NAME = "meshsync_bake_history.json"
+# Oldest measurements are dropped beyond this:
+BAKE_HISTORY_MAX_RECORDS = 1000
+# Measurements needed before they are used instead of the default cost model:
+BAKE_HISTORY_MIN_RECORDS = 5
+
+# Node properties that don't change how the node is evaluated:
+# How deep nested structs of node properties are followed when hashing:
+MAX_HASH_STRUCT_DEPTH = 4
+
+NODE_UI_PROPERTIES = {"rna_type", "name", "label", "location", "width", "width_hidden", "height", "dimensions",
+                      "inputs", "outputs", "internal_links", "parent", "use_custom_color", "color", "select",
+                      "show_options", "show_preview", "hide", "show_texture", "mute", "type"}
+
+
+# Modification tracking for incremental bakes.
+# Every change reported by the depsgraph increments the counter and stamps the changed ID with it,
+# an object needs to be baked again if anything it depends on has a newer stamp than its last bake:
+msb_modificationCounter = 0
+msb_modificationStamps = {}
+msb_bakeStamps = {}
+msb_isBaking = False
+
+# Names of baked images that were written to their files in the background but still use their generated pixels:
+msb_imagesWrittenInBackground = set()
+
+# Result of the last meshsync.plan_bake call:
+msb_lastBakePlan = None
+
+
+# Bake messages go through python's logging, so they can also be sent to files, e.g. on render farm machines:
+msb_logger = logging.getLogger(__name__)
+
+LOG_LEVELS = {LogLevel.VERBOSE: logging.DEBUG,
+              LogLevel.NORMAL: logging.INFO,
+              LogLevel.ERROR: logging.ERROR}
+
+
+def msb_setLogLevel(level):
+    '''
+    Sets the lowest LogLevel of messages that are logged.
+    '''
+    global showLogLevel
+    showLogLevel = level
+    msb_logger.setLevel(LOG_LEVELS[level])
+
+
+def msb_setupLogging():
+    msb_setLogLevel(showLogLevel)
+
+    # Print to the console like before, only once when the module is reloaded:
+    if not any(getattr(x, "isMeshSyncConsoleHandler", False) for x in msb_logger.handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.isMeshSyncConsoleHandler = True
+        msb_logger.addHandler(handler)
+
+
+def msb_log(message, *args, level=LogLevel.VERBOSE):
+    '''
+    Logs the message if the level is enabled. Nothing is formatted otherwise.
+    :param message: %-style format string for args, or a function that returns the message
+    '''
+    loggingLevel = LOG_LEVELS[level]
+    if not msb_logger.isEnabledFor(loggingLevel):
+        return
+
+    if callable(message):
+        message = message()
+
+    msb_logger.log(loggingLevel, message, *args)
+
+
+msb_setupLogging()
+
+
+def msb_getModificationKey(id):
+    return (type(id).__name__, id.name_full)
+
+
+@persistent
+def msb_trackBakeModifications(scene, depsgraph=None):
+    '''
+    Stamps IDs that changed in a way that affects the baked textures.
+    '''
+    global msb_modificationCounter
+
+    # Baking changes the objects itself, those changes are already baked:
+    if msb_isBaking or depsgraph is None:
+        return
+
+    for update in depsgraph.updates:
+        id = update.id.original
+        # Moving objects doesn't change their materials:
+        if isinstance(id, bpy.types.Object) and not (update.is_updated_geometry or update.is_updated_shading):
+            continue
+
+        if not isinstance(id, (bpy.types.Object, bpy.types.Mesh, bpy.types.Material, bpy.types.NodeTree,
+                               bpy.types.Image)):
+            continue
+
+        # Registered pixels of a baked image are outdated once it's painted on:
+        if isinstance(id, bpy.types.Image):
+            msb_unregisterBakedImage(id.name)
+
+        msb_modificationCounter += 1
+        msb_modificationStamps[msb_getModificationKey(id)] = msb_modificationCounter
+
+        # Node groups and images can be used by any material, don't try to track where:
+        if isinstance(id, (bpy.types.NodeTree, bpy.types.Image)):
+            msb_modificationStamps[("*", "*")] = msb_modificationCounter
+
+
+def msb_isBakeOutdated(obj):
+    '''
+    :return: True if the object was never baked or anything it depends on changed since its last bake.
+    '''
+    bakeStamp = msb_bakeStamps.get(obj.name_full)
+    if bakeStamp is None:
+        return True
+
+    dependencies = [obj, obj.data]
+    for matSlot in obj.material_slots:
+        mat = matSlot.material
+        if mat is None:
+            continue
+        dependencies.append(mat)
+        if ORIGINAL_MATERIAL in mat and mat[ORIGINAL_MATERIAL] in bpy.data.materials:
+            dependencies.append(bpy.data.materials[mat[ORIGINAL_MATERIAL]])
+
+    modificationKeys = [("*", "*")] + [msb_getModificationKey(x) for x in dependencies if x is not None]
+    return any(msb_modificationStamps.get(key, 0) > bakeStamp for key in modificationKeys)
+
+
+def msb_setBakeInProgress(inProgress, bakedObjects=None):
+    '''
+    Turns modification tracking off while baking and remembers when the given objects were baked.
+    '''
+    global msb_isBaking
+
+    if not inProgress:
+        # Changes made by the bake are reported on the next depsgraph update, make that happen while
+        # tracking is still off:
+        bpy.context.evaluated_depsgraph_get().update()
+
+        for obj in bakedObjects or []:
+            msb_bakeStamps[obj.name_full] = msb_modificationCounter
+
+    msb_isBaking = inProgress
+
+
+def msb_resetBakeModifications():
+    global msb_modificationCounter, msb_isBaking
+    msb_modificationCounter = 0
+    msb_modificationStamps.clear()
+    msb_bakeStamps.clear()
+    msb_isBaking = False
+
+
+@persistent
+def msb_useWrittenBakedImageFiles(dummy):
+    '''
+    Switches images written in the background to their files before the blend file is saved.
+    Generated images would be blank when the file is opened again otherwise.
+    '''
+    for imageName in msb_imagesWrittenInBackground:
+        image = bpy.data.images.get(imageName)
+        if image is None or image.source != 'GENERATED' or len(image.filepath_raw) == 0:
+            continue
+
+        colorSpace = image.colorspace_settings.name
+        image.source = 'FILE'
+        image.colorspace_settings.name = colorSpace
+
+    msb_imagesWrittenInBackground.clear()
 
 
 def msb_canObjectMaterialsBeBaked(obj: bpy.types.Object) -> bool:
@@ -63,6 +284,820 @@ def msb_canObjectMaterialsBeBaked(obj: bpy.types.Object) -> bool:
     return True
 
 
+class UnhashableValueError(Exception):
+    '''
+    Raised when a value's content cannot be hashed reliably, so anything depending on it must not be cached.
+    '''
+    pass
+
+
+def msb_hashImage(hasher, image):
+    '''
+    Adds the image's content to the hash: the file it was loaded from, the packed data or the generation settings.
+    '''
+    # Unsaved edits (e.g. texture painting) only exist in memory:
+    if image.is_dirty:
+        raise UnhashableValueError(f"Image '{image.name_full}' has unsaved changes")
+
+    hasher.update(f"{image.name_full}|{image.source}|{image.filepath}|{tuple(image.size)}".encode())
+    hasher.update(f"{image.colorspace_settings.name}|{image.alpha_mode}".encode())
+
+    if image.packed_file is not None:
+        hasher.update(image.packed_file.data)
+    elif image.source == 'GENERATED':
+        hasher.update(f"{image.generated_type}|{tuple(image.generated_color)}|{image.use_generated_float}".encode())
+    else:
+        path = bpy.path.abspath(image.filepath)
+        if len(image.filepath) > 0 and os.path.isfile(path):
+            hasher.update(str(os.path.getmtime(path)).encode())
+
+
+def msb_hashStruct(hasher, struct, depth):
+    '''
+    Adds all properties of a nested struct (color ramps, curve mappings, texture mappings etc.) to the hash.
+    '''
+    # Structs can point back to their owners, stop before following those in circles:
+    if depth > MAX_HASH_STRUCT_DEPTH:
+        return
+
+    hasher.update(struct.bl_rna.identifier.encode())
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in ("rna_type", "select"):
+            continue
+        hasher.update(prop.identifier.encode())
+        msb_hashValue(hasher, getattr(struct, prop.identifier, None), depth + 1)
+
+
+def msb_hashValue(hasher, value, depth=0):
+    '''
+    Adds a property value to the hash. IDs are hashed by name, images by their content and nested structs by their
+    properties.
+    '''
+    if isinstance(value, bpy.types.Image):
+        msb_hashImage(hasher, value)
+    elif isinstance(value, bpy.types.NodeTree):
+        msb_hashNodeTree(hasher, value)
+    elif isinstance(value, bpy.types.ID):
+        hasher.update(value.name_full.encode())
+    elif isinstance(value, (bool, int, float, str)) or value is None:
+        hasher.update(repr(value).encode())
+    elif isinstance(value, bpy.types.bpy_prop_collection):
+        hasher.update(str(len(value)).encode())
+        for item in value:
+            msb_hashValue(hasher, item, depth)
+    elif isinstance(value, bpy.types.bpy_struct):
+        msb_hashStruct(hasher, value, depth)
+    elif hasattr(value, "__len__"):
+        hasher.update(repr(tuple(value)).encode())
+    else:
+        hasher.update(repr(value).encode())
+
+
+def msb_hashNodeTree(hasher, node_tree):
+    '''
+    Adds everything in the node tree that affects its result to the hash, including node groups.
+    Raises UnhashableValueError if the tree uses images with unsaved changes.
+    '''
+    for node in sorted(node_tree.nodes, key=lambda x: x.name):
+        hasher.update(f"{node.name}|{node.bl_idname}|{node.mute}".encode())
+
+        for prop in node.bl_rna.properties:
+            if prop.identifier in NODE_UI_PROPERTIES or prop.identifier.startswith("bl_"):
+                continue
+            msb_hashValue(hasher, getattr(node, prop.identifier, None))
+
+        for input in node.inputs:
+            hasher.update(input.identifier.encode())
+            if hasattr(input, "default_value"):
+                msb_hashValue(hasher, input.default_value)
+
+    links = [(link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier,
+              getattr(link, "is_muted", False)) for link in node_tree.links]
+    hasher.update(repr(sorted(links)).encode())
+
+
+def msb_writePNG(filepath, pixels, compression):
+    '''
+    Writes 8 bit pixels to a PNG file. zlib releases the GIL, so this can run in a background thread.
+    :param pixels: uint8 array with the shape (height, width, channels), bottom row first like blender images
+    :param compression: 0..100 like blender's PNG compression setting
+    '''
+    import numpy as np
+    height, width, channels = pixels.shape
+    colorType = {3: 2, 4: 6}[channels]
+
+    # PNG rows are top to bottom:
+    rows = np.ascontiguousarray(pixels[::-1]).reshape(height, width * channels)
+
+    # Each row starts with its filter type, use 'sub' (difference to the previous pixel), it suits baked maps well:
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 1
+    filtered[:, 1:channels + 1] = rows[:, :channels]
+    np.subtract(rows[:, channels:], rows[:, :-channels], out=filtered[:, channels + 1:])
+
+    def chunk(chunkType, data):
+        return struct.pack(">I", len(data)) + chunkType + data + \
+               struct.pack(">I", zlib.crc32(chunkType + data) & 0xFFFFFFFF)
+
+    with open(filepath, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, colorType, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(filtered.tobytes(), round(compression * 9 / 100))))
+        f.write(chunk(b"IEND", b""))
+
+
+def msb_writeTGA(filepath, pixels):
+    '''
+    Writes 8 bit pixels to an uncompressed TGA file.
+    :param pixels: uint8 array with the shape (height, width, channels), bottom row first like blender images
+    '''
+    height, width, channels = pixels.shape
+
+    # TGA stores BGR(A) and the bottom row first by default:
+    bgr = pixels[:, :, [2, 1, 0, 3][:channels]]
+    header = struct.pack("<BBBHHBHHHHBB", 0, 0, 2, 0, 0, 0, 0, 0, width, height, channels * 8,
+                         8 if channels == 4 else 0)
+
+    with open(filepath, "wb") as f:
+        f.write(header)
+        f.write(bgr.tobytes())
+
+
+def msb_getImagePixels8Bit(image, bufferPool):
+    '''
+    :return: The RGBA pixels of the image as a uint8 array with the shape (height, width, 4), bottom row first.
+    '''
+    import numpy as np
+    width, height = image.size
+
+    pixels = bufferPool.get("pixels", width * height * 4)
+    image.pixels.foreach_get(pixels)
+
+    # Images are 8 bit, this gives the same values as saving them with blender:
+    np.multiply(pixels, 255, out=pixels)
+    np.add(pixels, 0.5, out=pixels)
+    np.clip(pixels, 0, 255, out=pixels)
+    return pixels.astype(np.uint8).reshape(height, width, 4)
+
+
+def msb_registerBakedImage(image, pixels):
+    '''
+    Lets meshsync send the baked pixels directly instead of reading the image from its file.
+    The pixels are kept until the image is unregistered, changed or another file is loaded.
+    '''
+    height, width, _ = pixels.shape
+    ms.Context().addBakedImage(image.name, image.as_pointer(), width, height, pixels)
+
+
+def msb_unregisterBakedImage(imageName):
+    ms.Context().removeBakedImage(imageName)
+
+
+def msb_registerPackedBakedImages(materials=None):
+    '''
+    Registers the pixels of baked ORM textures, the exporter sends each channel of them as its own texture and
+    can only read the channels from registered pixels. Reading the pixels loads the images from their files.
+    :param materials: Materials to look for ORM textures in, None for all materials
+    '''
+    # Background processes don't sync:
+    if bpy.app.background:
+        return
+
+    bufferPool = BakeBufferPool()
+    registered = set()
+    for mat in bpy.data.materials if materials is None else materials:
+        if mat is None or mat.node_tree is None:
+            continue
+
+        imageNode = mat.node_tree.nodes.get(BAKED_ORM_IMAGE_NODE_NAME)
+        if imageNode is None or imageNode.type != 'TEX_IMAGE' or imageNode.image is None:
+            continue
+
+        image = imageNode.image
+        if image in registered:
+            continue
+        registered.add(image)
+
+        if not image.has_data and (image.source != 'FILE' or not os.path.isfile(bpy.path.abspath(image.filepath))):
+            msb_log("Baked ORM texture '%s' has no pixels, it cannot be sent.", image.name, level=LogLevel.ERROR)
+            continue
+
+        try:
+            msb_registerBakedImage(image, msb_getImagePixels8Bit(image, bufferPool))
+        except Exception as e:
+            msb_log("Could not read baked ORM texture '%s': %s", image.name, e, level=LogLevel.ERROR)
+
+
+class BakeTrace:
+    '''
+    Collects timing spans of the steps of a bake and writes them as Chrome trace events
+    that can be opened in chrome://tracing or ui.perfetto.dev.
+    '''
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.events = []
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        '''
+        Measures the time spent in the with block.
+        :param args: Object, material, channel etc. the step works on, shown with the span
+        '''
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            # Appending is thread safe, spans can be recorded by the image writer threads too:
+            self.events.append({"name": name,
+                                "cat": "bake",
+                                "ph": "X",
+                                "ts": start / 1000,
+                                "dur": (end - start) / 1000,
+                                "pid": os.getpid(),
+                                "tid": threading.get_ident(),
+                                "args": args})
+
+    def addEvents(self, filepath):
+        '''
+        Adds the spans from the trace file of another process.
+        '''
+        try:
+            with open(filepath) as f:
+                self.events.extend(json.load(f)["traceEvents"])
+        except Exception as e:
+            msb_log("Could not read bake trace '%s': %s", filepath, e, level=LogLevel.ERROR)
+
+    def save(self):
+        try:
+            with open(bpy.path.abspath(self.filepath), "w") as f:
+                json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        except Exception as e:
+            msb_log("Could not write bake trace '%s': %s", self.filepath, e, level=LogLevel.ERROR)
+
+
+class BakeTraceDisabled:
+    '''
+    Used instead of BakeTrace when tracing is off, so spans cost almost nothing.
+    '''
+    nullSpan = contextlib.nullcontext()
+
+    def span(self, name, **args):
+        return self.nullSpan
+
+    def addEvents(self, filepath):
+        pass
+
+    def save(self):
+        pass
+
+
+def msb_createBakeTrace(context):
+    traceFile = context.scene.meshsync_bake_settings.trace_file
+    if len(traceFile) > 0:
+        return BakeTrace(traceFile)
+    return BakeTraceDisabled()
+
+
+class RerouteTable:
+    '''
+    Resolves nodes and sockets through reroute nodes with dictionary lookups.
+    The links of the node tree are read once, reading socket.links goes through all links of the tree each time.
+    '''
+
+    def __init__(self, node_tree):
+        # First link into each input socket, like socket.links[0]:
+        self.inputLinks = {}
+        for link in node_tree.links:
+            self.inputLinks.setdefault(link.to_socket.as_pointer(), link)
+
+        self.resolved = {}
+
+    def getInputLink(self, socket):
+        '''
+        :return: The link connected to the input socket or None.
+        '''
+        return self.inputLinks.get(socket.as_pointer())
+
+    def resolve(self, nodeOrSocket):
+        '''
+        :return: The first node or socket upstream that is not a reroute node, None if it is muted or not connected.
+        '''
+        key = nodeOrSocket.as_pointer()
+        if key in self.resolved:
+            return self.resolved[key]
+
+        isSocket = isinstance(nodeOrSocket, bpy.types.NodeSocket)
+        result = nodeOrSocket
+        visited = set()
+        while result is not None:
+            node = result.node if isSocket else result
+            if node.mute:
+                result = None
+                break
+
+            if node.type != 'REROUTE' or node.as_pointer() in visited:
+                break
+            visited.add(node.as_pointer())
+
+            link = self.getInputLink(node.inputs[0])
+            if link is None:
+                result = None
+            else:
+                result = link.from_socket if isSocket else link.from_node
+
+        self.resolved[key] = result
+        return result
+
+
+class BakedImageWriter:
+    '''
+    Writes baked images in background threads so baking can continue while they are compressed.
+    '''
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.executor = ThreadPoolExecutor(max_workers=max(1, min(8, (os.cpu_count() or 1) // 2)))
+        self.pendingWrites = []
+
+    def write(self, image, pixels, filepath, fileFormat, compression, keepPixels=False):
+        '''
+        Writes the pixels of the image to the file in the background.
+        :param pixels: Pixels from 'msb_getImagePixels8Bit', they must not be modified until the write is finished
+        :param keepPixels: Keep the registered pixels after writing instead of sending the file
+        '''
+        channels = 4 if image.depth in [32, 128] else 3
+        pixels = pixels[:, :, :channels]
+
+        if fileFormat == 'TARGA_RAW':
+            future = self.executor.submit(self.writeFile, msb_writeTGA, filepath, pixels)
+        else:
+            future = self.executor.submit(self.writeFile, msb_writePNG, filepath, pixels, compression)
+
+        self.pendingWrites.append((image.name, filepath, fileFormat, keepPixels, future))
+
+    def writeFile(self, writeFunction, filepath, *args):
+        with self.trace.span("Write image", image=os.path.basename(filepath)):
+            writeFunction(filepath, *args)
+
+    def finish(self):
+        '''
+        Waits for all writes and points the images to their files.
+        The images keep their pixels, they are only switched to the files when the blend file is saved.
+        :return: File paths that could not be written
+        '''
+        failedFiles = []
+        for imageName, filepath, fileFormat, keepPixels, future in self.pendingWrites:
+            try:
+                future.result()
+            except Exception as e:
+                msb_log("Could not write baked image '%s': %s", filepath, e, level=LogLevel.ERROR)
+                failedFiles.append(filepath)
+                continue
+
+            image = bpy.data.images.get(imageName)
+            if image is None:
+                continue
+
+            # Changing the source or filepath would free the pixels and load the file again:
+            image.filepath_raw = filepath
+            image.file_format = fileFormat
+            msb_imagesWrittenInBackground.add(imageName)
+
+            # The file can be sent now, the pixels don't need to be kept in memory anymore:
+            if not keepPixels:
+                msb_unregisterBakedImage(imageName)
+
+        self.pendingWrites = []
+        self.executor.shutdown(wait=True)
+        return failedFiles
+
+
+class BakeBufferPool:
+    '''
+    Hands out numpy arrays for foreach_get/foreach_set that only grow, so the same memory
+    is reused for every object instead of allocating new arrays each time.
+    '''
+
+    def __init__(self):
+        self.buffers = {}
+
+    def get(self, name, size, dtype=None):
+        '''
+        :param name: Arrays that are used at the same time need different names
+        :return: Contiguous array with the given size. The contents are undefined.
+        '''
+        import numpy as np
+        dtype = np.dtype(np.float32 if dtype is None else dtype)
+
+        buffer = self.buffers.get((name, dtype))
+        if buffer is None or len(buffer) < size:
+            buffer = np.empty(size, dtype=dtype)
+            self.buffers[(name, dtype)] = buffer
+
+        return buffer[:size]
+
+    def clear(self):
+        self.buffers.clear()
+
+
+def msb_getBakeHistoryPath():
+    return os.path.join(bpy.utils.user_resource('CONFIG'), BAKE_HISTORY_FILE_NAME)
+
+
+class BakeCostModel:
+    '''
+    Predicts how many seconds a map takes to bake from the measured durations of previous bakes.
+    The duration is modelled as a linear function of the pixel count, pixels times samples and polygon count,
+    fitted separately for each bake type and render device.
+    '''
+
+    # Used until there are enough measurements:
+    DEFAULT_COEFFICIENTS = (0.5, 0.5, 0.01, 2.0)
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.records = self.loadRecords()
+        self.newRecords = []
+        self.coefficients = {}
+
+    def loadRecords(self):
+        if not os.path.isfile(self.filepath):
+            return []
+
+        try:
+            with open(self.filepath) as f:
+                return json.load(f)["records"]
+        except Exception as e:
+            msb_log("Could not read bake history '%s': %s", self.filepath, e, level=LogLevel.ERROR)
+            return []
+
+    def save(self):
+        '''
+        Adds the new measurements to the history file. Measurements written by other processes in the meantime are kept.
+        '''
+        if len(self.newRecords) == 0:
+            return
+
+        records = self.loadRecords() + self.newRecords
+        self.newRecords = []
+
+        try:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+
+            # Background bake processes save at the same time, don't let them read a partially written file:
+            tempPath = f"{self.filepath}.{os.getpid()}.tmp"
+            with open(tempPath, "w") as f:
+                json.dump({"records": records[-BAKE_HISTORY_MAX_RECORDS:]}, f)
+            os.replace(tempPath, self.filepath)
+        except Exception as e:
+            msb_log("Could not write bake history '%s': %s", self.filepath, e, level=LogLevel.ERROR)
+
+    @staticmethod
+    def getFeatures(pixels, samples, polygons):
+        megaPixels = pixels / 1000000
+        return [1.0, megaPixels, megaPixels * samples, polygons / 1000000]
+
+    def getCoefficients(self, bakeType, device):
+        key = (bakeType, device)
+        if key in self.coefficients:
+            return self.coefficients[key]
+
+        # Use the most specific measurements there are enough of:
+        coefficients = self.DEFAULT_COEFFICIENTS
+        for matches in [lambda x: x["bakeType"] == bakeType and x["device"] == device,
+                        lambda x: x["bakeType"] == bakeType,
+                        lambda x: True]:
+            records = [x for x in self.records if matches(x)]
+            if len(records) >= BAKE_HISTORY_MIN_RECORDS:
+                coefficients = self.fit(records)
+                break
+
+        self.coefficients[key] = coefficients
+        return coefficients
+
+    def fit(self, records):
+        import numpy as np
+        features = np.array([self.getFeatures(x["pixels"], x["samples"], x["polygons"]) for x in records])
+        seconds = np.array([x["seconds"] for x in records])
+
+        coefficients = np.linalg.lstsq(features, seconds, rcond=None)[0]
+
+        # More pixels, samples or polygons never make a bake faster:
+        return tuple(max(0.0, float(x)) for x in coefficients)
+
+    def predict(self, bakeType, device, pixels, samples, polygons):
+        '''
+        :return: Expected duration of the bake in seconds.
+        '''
+        coefficients = self.getCoefficients(bakeType, device)
+        features = self.getFeatures(pixels, samples, polygons)
+        return max(0.01, sum(c * f for c, f in zip(coefficients, features)))
+
+    def record(self, bakeType, device, pixels, samples, polygons, seconds):
+        record = {"bakeType": bakeType,
+                  "device": device,
+                  "pixels": pixels,
+                  "samples": samples,
+                  "polygons": polygons,
+                  "seconds": round(seconds, 3)}
+        self.records.append(record)
+        self.newRecords.append(record)
+
+        # Fit again with the new measurement:
+        self.coefficients.clear()
+
+
+def msb_doesNodeTreeDependOnObject(node_tree):
+    '''
+    :return: True if the node tree or any group in it reads the object it is evaluated on.
+    '''
+    for node in node_tree.nodes:
+        if node.bl_idname == "GeometryNodeSelfObject":
+            return True
+        if node.bl_idname == "GeometryNodeObjectInfo" and getattr(node, "transform_space", "") == 'RELATIVE':
+            return True
+        if node.type == 'GROUP' and node.node_tree is not None and msb_doesNodeTreeDependOnObject(node.node_tree):
+            return True
+    return False
+
+
+def msb_doesShaderNodeTreeDependOnObject(node_tree):
+    '''
+    :return: True if the shader node tree or any group in it gives different results on objects with the same mesh,
+    e.g. because it reads the object's transform, random value or attributes.
+    '''
+    for node in node_tree.nodes:
+        if node.mute:
+            continue
+        if node.type == 'OBJECT_INFO' and any(output.is_linked for output in node.outputs):
+            return True
+        if node.type == 'ATTRIBUTE' and getattr(node, "attribute_type", 'GEOMETRY') in ['OBJECT', 'INSTANCER']:
+            return True
+        if node.type == 'TEX_COORD' and node.object is not None and node.outputs['Object'].is_linked:
+            return True
+        # World space positions and normals:
+        if node.type == 'NEW_GEOMETRY' and (node.outputs['Position'].is_linked or node.outputs['Normal'].is_linked):
+            return True
+        if node.type == 'GROUP' and node.node_tree is not None and \
+                msb_doesShaderNodeTreeDependOnObject(node.node_tree):
+            return True
+    return False
+
+
+def msb_hashMesh(hasher, mesh, bufferPool):
+    '''
+    Adds the geometry, UVs and attributes of the mesh to the hash.
+    '''
+    import numpy as np
+
+    coordinates = bufferPool.get("hash", len(mesh.vertices) * 3)
+    mesh.vertices.foreach_get("co", coordinates)
+    hasher.update(coordinates)
+
+    loopVertices = bufferPool.get("hash", len(mesh.loops), np.int32)
+    mesh.loops.foreach_get("vertex_index", loopVertices)
+    hasher.update(loopVertices)
+
+    loopStarts = bufferPool.get("hash", len(mesh.polygons), np.int32)
+    mesh.polygons.foreach_get("loop_start", loopStarts)
+    hasher.update(loopStarts)
+
+    materialIndices = bufferPool.get("hash", len(mesh.polygons), np.int32)
+    mesh.polygons.foreach_get("material_index", materialIndices)
+    hasher.update(materialIndices)
+
+    if mesh.uv_layers.active is not None:
+        uvs = bufferPool.get("hash", len(mesh.loops) * 2)
+        mesh.uv_layers.active.data.foreach_get("uv", uvs)
+        hasher.update(uvs)
+
+    # Attributes can be used by shaders:
+    attributeLayouts = {'FLOAT': ("value", 1, np.float32), 'INT': ("value", 1, np.int32),
+                        'FLOAT_VECTOR': ("vector", 3, np.float32), 'FLOAT2': ("vector", 2, np.float32),
+                        'FLOAT_COLOR': ("color", 4, np.float32), 'BYTE_COLOR': ("color", 4, np.float32)}
+    for attribute in getattr(mesh, "attributes", []):
+        hasher.update(f"{attribute.name}|{attribute.data_type}|{attribute.domain}".encode())
+        if attribute.data_type not in attributeLayouts:
+            continue
+
+        propertyName, componentCount, dtype = attributeLayouts[attribute.data_type]
+        values = bufferPool.get("hash", len(attribute.data) * componentCount, dtype)
+        attribute.data.foreach_get(propertyName, values)
+        hasher.update(values)
+
+
+# Node properties that are not copied when node groups are inlined:
+NODE_COPY_IGNORED_PROPERTIES = {"name", "label", "location", "width", "width_hidden", "height", "dimensions",
+                                "parent", "select", "show_options", "show_preview", "show_texture", "hide"}
+
+
+def msb_copyNodeSettings(source, target):
+    '''
+    Copies the settings and input values of a node to a node of the same type in another node tree.
+    '''
+    for prop in source.bl_rna.properties:
+        if prop.is_readonly or prop.identifier in NODE_COPY_IGNORED_PROPERTIES or prop.identifier.startswith("bl_"):
+            continue
+        try:
+            setattr(target, prop.identifier, getattr(source, prop.identifier))
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+    # Color ramps, curves, image users and texture/color mappings are read-only pointers, copy their contents:
+    if getattr(source, "color_ramp", None) is not None:
+        msb_copyColorRamp(source.color_ramp, target.color_ramp)
+
+    for structName in ["image_user", "texture_mapping", "color_mapping"]:
+        if getattr(source, structName, None) is not None:
+            msb_copyStructProperties(getattr(source, structName), getattr(target, structName))
+
+    if getattr(source, "mapping", None) is not None and hasattr(source.mapping, "curves"):
+        for sourceCurve, targetCurve in zip(source.mapping.curves, target.mapping.curves):
+            while len(targetCurve.points) < len(sourceCurve.points):
+                targetCurve.points.new(0, 0)
+            for sourcePoint, targetPoint in zip(sourceCurve.points, targetCurve.points):
+                targetPoint.location = sourcePoint.location
+                targetPoint.handle_type = sourcePoint.handle_type
+        target.mapping.use_clip = source.mapping.use_clip
+        target.mapping.black_level = source.mapping.black_level
+        target.mapping.white_level = source.mapping.white_level
+        target.mapping.update()
+
+    # Value and RGB nodes store their value on the output:
+    for sourceSocket, targetSocket in itertools.chain(zip(source.inputs, target.inputs),
+                                                      zip(source.outputs, target.outputs)):
+        if hasattr(sourceSocket, "default_value"):
+            try:
+                targetSocket.default_value = sourceSocket.default_value
+            except (AttributeError, TypeError, ValueError):
+                pass
+
+
+def msb_copyColorRamp(sourceRamp, targetRamp):
+    targetRamp.color_mode = sourceRamp.color_mode
+    targetRamp.interpolation = sourceRamp.interpolation
+    targetRamp.hue_interpolation = sourceRamp.hue_interpolation
+    while len(targetRamp.elements) < len(sourceRamp.elements):
+        targetRamp.elements.new(0)
+    while len(targetRamp.elements) > len(sourceRamp.elements):
+        targetRamp.elements.remove(targetRamp.elements[-1])
+    for sourceElement, targetElement in zip(sourceRamp.elements, targetRamp.elements):
+        targetElement.position = sourceElement.position
+        targetElement.color = sourceElement.color
+
+
+def msb_copyStructProperties(source, target):
+    '''
+    Copies the writable properties of a nested struct of a node, e.g. its image user or texture mapping.
+    '''
+    for prop in source.bl_rna.properties:
+        if prop.identifier == "rna_type":
+            continue
+
+        value = getattr(source, prop.identifier, None)
+        if isinstance(value, bpy.types.ColorRamp):
+            msb_copyColorRamp(value, getattr(target, prop.identifier))
+            continue
+
+        if prop.is_readonly or prop.type == 'COLLECTION':
+            continue
+        try:
+            setattr(target, prop.identifier, value)
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+
+def msb_setSocketDefaultValue(socket, value):
+    '''
+    Sets the default value of the socket, converting between single values and vectors/colors.
+    '''
+    if not hasattr(socket, "default_value"):
+        return
+
+    try:
+        if hasattr(socket.default_value, "__len__") and not hasattr(value, "__len__"):
+            socket.default_value = [value] * len(socket.default_value)
+        elif not hasattr(socket.default_value, "__len__") and hasattr(value, "__len__"):
+            socket.default_value = sum(value[:3]) / min(3, len(value))
+        else:
+            socket.default_value = value
+    except (AttributeError, TypeError, ValueError):
+        pass
+
+
+def msb_findSocket(sockets, identifier):
+    for socket in sockets:
+        if socket.identifier == identifier:
+            return socket
+    return None
+
+
+def msb_inlineNodeGroup(node_tree, groupNode, groupStack=()):
+    '''
+    Replaces a group node with copies of the nodes in its group using the data API.
+    Group nodes inside the group are inlined right away as well.
+    '''
+    group = groupNode.node_tree
+    nodes = node_tree.nodes
+    links = node_tree.links
+
+    # Copy the nodes of the group:
+    copies = {}
+    nestedGroupNodes = []
+    for node in group.nodes:
+        if node.type in ['GROUP_INPUT', 'GROUP_OUTPUT']:
+            continue
+
+        copy = nodes.new(node.bl_idname)
+        msb_copyNodeSettings(node, copy)
+        copy.location = groupNode.location + node.location
+        copy.label = node.label
+        copies[node.name] = copy
+
+        if node.type == 'GROUP' and node.node_tree is not None and not node.mute:
+            nestedGroupNodes.append(copy)
+
+    for node in group.nodes:
+        if node.parent is not None and node.name in copies and node.parent.name in copies:
+            copies[node.name].parent = copies[node.parent.name]
+
+    def getOuterInputSource(socket):
+        # What is connected to the group node input that matches the socket of the group input node:
+        groupInput = msb_findSocket(groupNode.inputs, socket.identifier)
+        if groupInput is None or len(groupInput.links) == 0:
+            return None, groupInput
+        return groupInput.links[0].from_socket, groupInput
+
+    # Connections that leave the group, by group output identifier:
+    outputSources = {}
+
+    for link in group.links:
+        if getattr(link, "is_muted", False):
+            continue
+
+        if link.to_node.type == 'GROUP_OUTPUT':
+            if link.from_node.type == 'GROUP_INPUT':
+                outputSources[link.to_socket.identifier] = getOuterInputSource(link.from_socket)
+            elif link.from_node.name in copies:
+                fromSocket = msb_findSocket(copies[link.from_node.name].outputs, link.from_socket.identifier)
+                outputSources[link.to_socket.identifier] = (fromSocket, None)
+            continue
+
+        if link.to_node.name not in copies:
+            continue
+
+        toSocket = msb_findSocket(copies[link.to_node.name].inputs, link.to_socket.identifier)
+        if toSocket is None:
+            continue
+
+        if link.from_node.type == 'GROUP_INPUT':
+            fromSocket, groupInput = getOuterInputSource(link.from_socket)
+            if fromSocket is not None:
+                links.new(fromSocket, toSocket)
+            elif groupInput is not None and hasattr(groupInput, "default_value"):
+                msb_setSocketDefaultValue(toSocket, groupInput.default_value)
+        elif link.from_node.name in copies:
+            fromSocket = msb_findSocket(copies[link.from_node.name].outputs, link.from_socket.identifier)
+            if fromSocket is not None:
+                links.new(fromSocket, toSocket)
+
+    # Connect everything that used the group's outputs:
+    for output in groupNode.outputs:
+        fromSocket, groupInput = outputSources.get(output.identifier, (None, None))
+        for link in list(output.links):
+            toSocket = link.to_socket
+            if fromSocket is not None:
+                links.new(fromSocket, toSocket)
+            elif groupInput is not None and hasattr(groupInput, "default_value"):
+                links.remove(link)
+                msb_setSocketDefaultValue(toSocket, groupInput.default_value)
+
+    nodes.remove(groupNode)
+
+    # The nested group nodes are connected now, inline them too:
+    groupStack = groupStack + (group,)
+    for nestedGroupNode in nestedGroupNodes:
+        if nestedGroupNode.node_tree in groupStack:
+            msb_log("Node group '%s' contains itself and cannot be inlined.",
+                    nestedGroupNode.node_tree.name, level=LogLevel.ERROR)
+            continue
+        msb_inlineNodeGroup(node_tree, nestedGroupNode, groupStack)
+
+
+def msb_inlineNodeGroups(node_tree):
+    '''
+    Replaces all group nodes in the node tree with the nodes in their groups, including nested groups.
+    Unlike bpy.ops.node.group_ungroup, this does not need a node editor and does not redraw the UI.
+    '''
+    groupNodes = [node for node in node_tree.nodes
+                  if node.type == 'GROUP' and node.node_tree is not None and not node.mute]
+
+    for groupNode in groupNodes:
+        msb_inlineNodeGroup(node_tree, groupNode)
+
+
 # Methods to help getting and setting nested attributes:
 def msb_rsetattr(obj, attr, val):
     pre, _, post = attr.rpartition('.')
@@ -143,10 +1178,74 @@ class MESHSYNC_BakeSettings(bpy.types.PropertyGroup):
     deduplication_enabled: bpy.props.BoolProperty(name="Deduplicate",
                                               description="Share meshes across objects if the object data and their modifiers are the same. This might not work for all modifiers.",
                                               default=True)
+    deduplicate_geometry_nodes: bpy.props.BoolProperty(name="Deduplicate geometry nodes",
+                                                       description="Also share meshes of objects with geometry nodes modifiers if the node trees and modifier inputs are the same. Objects whose node trees use their own object are never shared.",
+                                                       default=False)
     realize_instances: bpy.props.BoolProperty(name="Realize instances",
                                             description = "Realize geometry node instances to include them in the bake", default = True)
+    use_bake_cache: bpy.props.BoolProperty(name="Reuse unchanged bakes",
+                                           description="Load previously baked textures from the baked texture path instead of baking them again if the material, mesh, UVs and bake settings did not change. Ambient occlusion is always baked.",
+                                           default=False)
+    pack_orm_texture: bpy.props.BoolProperty(name="Pack ORM texture",
+                                             description="Combine baked ambient occlusion, roughness and metallic maps into one texture (R: AO, G: roughness, B: metallic) instead of saving a texture for each of them.",
+                                             default=False)
+    pack_scalar_bakes: bpy.props.BoolProperty(name="Combine scalar bakes",
+                                              description="Bake up to 3 scalar channels (e.g. metallic, roughness) in a single bake pass and split them into separate textures afterwards. This reduces the number of bake passes.",
+                                              default=True)
+    incremental_bake: bpy.props.BoolProperty(name="Only bake changes",
+                                             description="Only bake objects that changed since they were last baked in this session, everything else keeps its baked materials.",
+                                             default=False)
+    bake_processes: bpy.props.IntProperty(name="Bake processes",
+                                          description="Number of background blender processes to split the objects to bake between. With 1, everything is baked in this blender instance.",
+                                          min=1,
+                                          max=64,
+                                          default=1)
+    emit_samples: bpy.props.IntProperty(name="Emission samples",
+                                        description="Cycles samples for channels that are baked directly from their inputs. These bakes don't have any noise, so 1 sample is enough unless the inputs are noisy themselves.",
+                                        min=1,
+                                        max=4096,
+                                        default=1)
+    ao_samples: bpy.props.IntProperty(name="AO samples",
+                                      description="Cycles samples for ambient occlusion bakes",
+                                      min=1,
+                                      max=4096,
+                                      default=100)
+    fallback_samples: bpy.props.IntProperty(name="Fallback samples",
+                                            description="Cycles samples for channels that can't be baked from their inputs directly and use blender's normal, diffuse or roughness bake instead",
+                                            min=1,
+                                            max=4096,
+                                            default=100)
+    use_adaptive_sampling: bpy.props.BoolProperty(name="Adaptive sampling",
+                                                  description="Stop sampling pixels that are below the noise threshold early. Only affects bakes with more than 1 sample.",
+                                                  default=False)
+    adaptive_threshold: bpy.props.FloatProperty(name="Noise threshold",
+                                                description="Noise level at which pixels stop being sampled when adaptive sampling is enabled",
+                                                min=0.0,
+                                                max=1.0,
+                                                precision=4,
+                                                default=0.01)
+    save_baked_images: bpy.props.BoolProperty(name="Save baked textures",
+                                              description="Save baked textures to the baked texture path. When this is off, baked textures are sent to Unity from memory and are lost when the file is closed",
+                                              default=True)
+    baked_image_format: bpy.props.EnumProperty(name="Image format",
+                                               items=(('PNG', 'PNG', 'Compressed PNG files'),
+                                                      ('TARGA_RAW', 'TGA (uncompressed)',
+                                                       'Uncompressed TGA files, fastest to write but larger')),
+                                               default='PNG')
+    png_compression: bpy.props.IntProperty(name="PNG compression",
+                                           description="Higher compression makes smaller files but takes longer to write",
+                                           subtype='PERCENTAGE',
+                                           min=0,
+                                           max=100,
+                                           default=15)
+    write_images_async: bpy.props.BoolProperty(name="Write images in background",
+                                               description="Write baked images in background threads while baking continues",
+                                               default=True)
+    trace_file: bpy.props.StringProperty(name="Trace file",
+                                         description="Write how long each step of baking takes to this file as Chrome trace events, to open in chrome://tracing or ui.perfetto.dev. Leave empty to turn this off",
+                                         subtype='FILE_PATH')
     run_modal: bpy.props.BoolProperty(name="Run Modal",
-                                            description="If this is enabled blender stays more interactive but baking is slower.",
+                                            description="Keep blender responsive while baking by handling events between short baking steps. Blender is frozen while each map is baked",
                                             default=False)
     bake_progress: bpy.props.FloatProperty(
         name="Progress",
@@ -167,8 +1266,18 @@ def msb_bakeAllChanged(self, context):
 
 @persistent
 def msb_setBakingDefaults(dummy):
-    context = bpy.context
-    bakeSettings = context.scene.meshsync_bake_settings
+    msb_initializeBakeSettings(bpy.context.scene.meshsync_bake_settings)
+    # Bake stamps and baked pixels are only valid for the file they were made in:
+    msb_resetBakeModifications()
+    msb_imagesWrittenInBackground.clear()
+    ms.Context().clearBakedImages()
+    msb_registerPackedBakedImages()
+
+
+def msb_initializeBakeSettings(bakeSettings):
+    '''
+    Resets the bake progress and makes sure there are settings for every channel.
+    '''
     bakeSettings.bake_progress = 0
     if len(bakeSettings.bake_channel_settings) != len(BAKED_CHANNELS):
         bakeSettings.bake_channel_settings.clear()
@@ -189,6 +1298,7 @@ class MESHSYNC_PT_Baking(MESHSYNC_PT, bpy.types.Panel):
         bakeSettings = context.scene.meshsync_bake_settings
 
         layout.prop(bakeSettings, "bake_selection", expand=True)
+        layout.prop(bakeSettings, "incremental_bake")
 
         box = layout.box()
         box.alignment = 'LEFT'
@@ -202,8 +1312,29 @@ class MESHSYNC_PT_Baking(MESHSYNC_PT, bpy.types.Panel):
         layout.prop(bakeSettings, "apply_modifiers")
         if bakeSettings.apply_modifiers:
             layout.prop(bakeSettings, "deduplication_enabled")
+            if bakeSettings.deduplication_enabled:
+                layout.prop(bakeSettings, "deduplicate_geometry_nodes")
             layout.prop(bakeSettings, "realize_instances")
+        layout.prop(bakeSettings, "pack_scalar_bakes")
+        layout.prop(bakeSettings, "use_bake_cache")
+        layout.prop(bakeSettings, "pack_orm_texture")
         layout.prop(bakeSettings, "run_modal")
+        layout.prop(bakeSettings, "bake_processes")
+        layout.prop(bakeSettings, "trace_file")
+
+        layout.prop(bakeSettings, "save_baked_images")
+        if bakeSettings.save_baked_images:
+            layout.prop(bakeSettings, "baked_image_format")
+            if bakeSettings.baked_image_format == 'PNG':
+                layout.prop(bakeSettings, "png_compression")
+            layout.prop(bakeSettings, "write_images_async")
+
+        layout.prop(bakeSettings, "emit_samples")
+        layout.prop(bakeSettings, "ao_samples")
+        layout.prop(bakeSettings, "fallback_samples")
+        layout.prop(bakeSettings, "use_adaptive_sampling")
+        if bakeSettings.use_adaptive_sampling:
+            layout.prop(bakeSettings, "adaptive_threshold")
 
         layout.prop(bakeSettings, "baked_texture_dimensions", expand=True)
         if bakeSettings.baked_texture_dimensions == 'PIXELS':
@@ -238,6 +1369,10 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
     bl_description = "Bakes textures, creates material copies and assigns the baked materials for all materials that " \
                      "cannot be exported without baking them to textures"
 
+    object_names: bpy.props.StringProperty(name="Object names",
+                                           description="JSON list of names of objects to bake instead of the objects set in the bake settings",
+                                           options={'HIDDEN', 'SKIP_SAVE'})
+
     maxBakeProgress = 0
     mapsToBake = 0
     currentBakeProgress = 0
@@ -267,22 +1402,23 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         outputNode = self.findMaterialOutputNode(mat.node_tree)
 
         if outputNode is None:
-            msb_log(f"Cannot find material output node with a surface input. Cannot bake {mat.name}!", LogLevel.ERROR)
+            msb_log("Cannot find material output node with a surface input. Cannot bake %s!",
+                    mat.name, level=LogLevel.ERROR)
             return None, None
 
         # Get used shader or whatever is connected to the material output node:
-        input = self.traverseReroutes(outputNode.inputs[0].links[0].from_node)
+        input = self.traverseReroutes(self.getInputLink(outputNode.inputs[0]).from_node)
         if input is None:
-            msb_log(f"Cannot find material output node with a valid surface input. Cannot bake {mat.name}!",
-                    LogLevel.ERROR)
+            msb_log("Cannot find material output node with a valid surface input. Cannot bake %s!",
+                    mat.name, level=LogLevel.ERROR)
             return outputNode, None
 
         if input.mute:
-            msb_log(f"Input to material output is muted. Cannot bake {mat.name}!", LogLevel.ERROR)
+            msb_log("Input to material output is muted. Cannot bake %s!", mat.name, level=LogLevel.ERROR)
             return outputNode, None
 
         if input.type in ['HOLDOUT']:
-            msb_log(f"Input to material output is an unsupported shader type: {input.type}!", LogLevel.ERROR)
+            msb_log("Input to material output is an unsupported shader type: %s!", input.type, level=LogLevel.ERROR)
             return outputNode, None
 
         return outputNode, input
@@ -291,15 +1427,24 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         for node in mat.node_tree.nodes:
             node.select = False
 
-    def isConnectedUpstream(self, nodeA, nodeB):
+    def getUpstreamNodeNames(self, node_tree, node):
         '''
-        True if nodeB is connected anywhere upstream of nodeA.
+        :return: Names of the node and all nodes connected anywhere upstream of it.
         '''
-        for input in nodeA.inputs:
-            for link in input.links:
-                if link.from_node == nodeB or self.isConnectedUpstream(link.from_node, nodeB):
-                    return True
-        return False
+        # Collect the inputs of every node in one pass over the links:
+        inputNodeNames = {}
+        for link in node_tree.links:
+            inputNodeNames.setdefault(link.to_node.name, []).append(link.from_node.name)
+
+        upstreamNodeNames = {node.name}
+        nodesToVisit = [node.name]
+        while len(nodesToVisit) > 0:
+            for inputNodeName in inputNodeNames.get(nodesToVisit.pop(), []):
+                if inputNodeName not in upstreamNodeNames:
+                    upstreamNodeNames.add(inputNodeName)
+                    nodesToVisit.append(inputNodeName)
+
+        return upstreamNodeNames
 
     def cleanUpNodeTreeAndConnectBakedBSDF(self, bakedMat, matOutput):
         node_tree = bakedMat.node_tree
@@ -308,10 +1453,8 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         node_tree.links.new(bakedBSDF.outputs[0], matOutput.inputs[0])
 
         # The currently selected nodes are used by baked version:
-        nodesToDelete = []
-        for node in node_tree.nodes:
-            if not node.select and node != matOutput and not self.isConnectedUpstream(matOutput, node):
-                nodesToDelete.append(node)
+        usedNodeNames = self.getUpstreamNodeNames(node_tree, matOutput)
+        nodesToDelete = [node for node in node_tree.nodes if not node.select and node.name not in usedNodeNames]
 
         for node in nodesToDelete:
             node_tree.nodes.remove(node)
@@ -323,7 +1466,10 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
                 return channelSetting.bakeChannelEnabled
         return False
 
-    def incrementProgress(self, context, message, obj=None, mode= ""):
+    def incrementProgress(self, context, message, cost=0, mode= ""):
+        '''
+        :param cost: Predicted seconds of the map that is baked next
+        '''
         bakeSettings = context.scene.meshsync_bake_settings
         if mode == "RESET":
             bakeSettings.bake_time_remaining = ""
@@ -333,18 +1479,21 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             bakeSettings.bake_progress = 100
             bakeSettings.bake_time_remaining = ""
         elif self.maxBakeProgress > 0:
-            bakeSettings.bake_progress += 100.0 / self.maxBakeProgress * self.getObjectProgressWeight(obj)
+            bakeSettings.bake_progress += 100.0 / self.maxBakeProgress * cost
             elapsedSeconds = datetime.timedelta(seconds=(time.time() - self.startTime)).total_seconds()
 
+            # Everything started before this map is finished:
+            finishedCost = self.bakedCost
+            self.bakedCost += cost
             self.currentBakeProgress += 1
 
             bakeSettings.bake_maps_remaining = f"Baking map {self.currentBakeProgress}/{self.mapsToBake}"
 
-            # The remaining time is not going to be very precise because
-            # it's hard to predict how complex each baking task is.
+            # The predicted costs are scaled by how long the finished maps actually took,
+            # this also accounts for the time spent preparing the objects.
             # Show approximate times only:
-            if elapsedSeconds > 3 and bakeSettings.bake_progress > 0:
-                remainingTotalSeconds = int(elapsedSeconds / (bakeSettings.bake_progress / 100) - elapsedSeconds)
+            if elapsedSeconds > 3 and finishedCost > 0:
+                remainingTotalSeconds = int((self.maxBakeProgress - finishedCost) * elapsedSeconds / finishedCost)
 
                 if remainingTotalSeconds <= 60:
                     bakeSettings.bake_time_remaining = "Estimated time left: Less than a minute."
@@ -361,7 +1510,15 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         bakeSettings.bake_message = message
 
     def addRealizeInstances(self, mod):
-        nodes = mod.node_group.nodes
+        '''
+        Makes the modifier use a copy of its node group with Realize Instances nodes before the outputs.
+        The original node group is not changed, other objects using it still get the same modifier hash.
+        :return: The copy of the node group, it should be removed after the modifier is applied
+        '''
+        node_group = mod.node_group.copy()
+        mod.node_group = node_group
+
+        nodes = node_group.nodes
         outputs = [x for x in nodes if x.type == "GROUP_OUTPUT"]
 
         for output in outputs:
@@ -370,38 +1527,79 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
             link = output.inputs[0].links[0]
             realize = nodes.new("GeometryNodeRealizeInstances")
-            mod.node_group.links.new(link.from_socket, realize.inputs[0])
-            mod.node_group.links.new(realize.outputs[0], link.to_socket)
+            node_group.links.new(link.from_socket, realize.inputs[0])
+            node_group.links.new(realize.outputs[0], link.to_socket)
+
+        return node_group
 
     def getModifierHash(self, obj):
         '''
-        Generates a unique string based on the object's data and its modifiers
+        Generates a unique hash based on the object's data and its modifiers
+        :return: The hash or an empty string if the object cannot be de-duplicated.
         '''
+        if obj.name_full in self.modifierHashCache:
+            return self.modifierHashCache[obj.name_full]
+
         try:
-            mods = obj.modifiers
-            values = [obj.data.name]
-            for mod in mods:
-                # Geo nodes might have different output for the same object data, so we cannot de-duplicate that:
-                if mod.type == 'NODES':
+            modifierHash = self.calculateModifierHash(obj)
+        except Exception as e:
+            msb_log("Could not hash the modifiers of '%s': %s", obj.name, e, level=LogLevel.ERROR)
+            modifierHash = ""
+
+        self.modifierHashCache[obj.name_full] = modifierHash
+        return modifierHash
+
+    def calculateModifierHash(self, obj):
+        bakeSettings = self.context.scene.meshsync_bake_settings
+
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(str(obj.data.as_pointer()).encode())
+
+        for mod in obj.modifiers:
+            # Ignore these, they won't be applied:
+            if mod.type in ['PARTICLE_SYSTEM', 'ARMATURE']:
+                continue
+
+            hasher.update(mod.type.encode())
+
+            if mod.type == 'NODES':
+                # Geo nodes might have different output for the same object data:
+                if not bakeSettings.deduplicate_geometry_nodes or mod.node_group is None:
                     return ""
 
-                # Ignore these, they won't be applied:
-                if mod.type in ['PARTICLE_SYSTEM', 'ARMATURE']:
-                    continue
+                try:
+                    msb_hashNodeTree(hasher, mod.node_group)
+                except UnhashableValueError:
+                    return ""
 
-                for prop in mod.bl_rna.properties.keys():
-                    if prop == "name" or prop == "rna_type" or prop == "custom_profile":
-                        continue
-                    value = getattr(mod, prop, True)
+                # Output depends on the object itself, it cannot be shared with other objects:
+                if msb_doesNodeTreeDependOnObject(mod.node_group):
+                    hasher.update(str(obj.as_pointer()).encode())
 
-                    # if the value is a float, round to 8 decimal places
-                    if isinstance(value, float):
-                        value = round(value, 5)
-                    values.append(value)
-            return ''.join(map(str, values))
-        except Exception as e:
-            print(e)
-            return ""
+                # Modifier inputs are stored as custom properties:
+                for key in sorted(mod.keys()):
+                    hasher.update(key.encode())
+                    self.hashModifierValue(hasher, mod[key])
+
+            for prop in mod.bl_rna.properties:
+                if prop.identifier in ["name", "rna_type", "custom_profile", "show_viewport", "show_render",
+                                       "show_in_editmode", "show_on_cage", "show_expanded", "is_active"]:
+                    continue
+                hasher.update(prop.identifier.encode())
+                self.hashModifierValue(hasher, getattr(mod, prop.identifier, None))
+
+        return hasher.hexdigest()
+
+    def hashModifierValue(self, hasher, value):
+        # Node trees are IDs too, but their content matters, not which tree it is:
+        if isinstance(value, bpy.types.NodeTree):
+            msb_hashNodeTree(hasher, value)
+        # Referenced objects, textures etc. by pointer so different IDs never collide:
+        elif isinstance(value, bpy.types.ID):
+            hasher.update(f"ID:{value.as_pointer()}".encode())
+        else:
+            hasher.update(type(value).__name__.encode())
+            msb_hashValue(hasher, value)
 
     def preBakeObject(self, obj):
         '''
@@ -425,7 +1623,8 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             if bakeSettings.apply_modifiers:
                 modifierInfo = self.getModifierHash(obj)
                 if len(modifierInfo) > 0 and modifierInfo in self.modifierDeDuplicationInfo:
-                    msb_log(f"Object's data: '{obj.name}' was already used by another object with the same modifier stack. It will be reused.", LogLevel.VERBOSE)
+                    msb_log("Object's data: '%s' was already used by another object with the same modifier stack. It will be reused.",
+                            obj.name, level=LogLevel.VERBOSE)
                     obj.data = self.modifierDeDuplicationInfo[modifierInfo]
                 else:
                     # Can't apply modifiers with shared data:
@@ -434,66 +1633,215 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
                         if mod.type in ['PARTICLE_SYSTEM', 'ARMATURE']:
                             continue
 
-                        if bakeSettings.realize_instances and mod.type == "NODES":
-                            self.addRealizeInstances(mod)
+                        originalGroup = realizeGroup = None
+                        if bakeSettings.realize_instances and mod.type == "NODES" and mod.node_group is not None:
+                            originalGroup = mod.node_group
+                            realizeGroup = self.addRealizeInstances(mod)
                         try:
-                            bpy.ops.object.modifier_apply(modifier=mod.name)
+                            with self.trace.span("Apply modifier", object=obj.name, modifier=mod.name):
+                                bpy.ops.object.modifier_apply(modifier=mod.name)
                         except Exception as e:
-                            print(f"Error applying modifier: {e}")
+                            msb_log("Error applying modifier: %s", e, level=LogLevel.ERROR)
+                            if realizeGroup is not None:
+                                mod.node_group = originalGroup
+
+                        if realizeGroup is not None:
+                            bpy.data.node_groups.remove(realizeGroup)
 
                     if bakeSettings.deduplication_enabled:
                         self.modifierDeDuplicationInfo[modifierInfo] = obj.data
             else:
-                msb_log(
-                    f"WARNING: Object '{obj.name}' has modifiers but the option to apply modifiers is disabled. The baked material will probably not be correct.",
-                    LogLevel.ERROR)
+                msb_log("WARNING: Object '%s' has modifiers but the option to apply modifiers is disabled. The baked material will probably not be correct.",
+                        obj.name, level=LogLevel.ERROR)
 
         # Make sure previous bake is undone:
         msb_revertBakedMaterials(obj)
 
-        if not msb_canObjectMaterialsBeBaked(obj):
-            return
+        # Node trees of removed materials can't be told apart from new ones at the same address:
+        self.rerouteTables.clear()
+
+        if not msb_canObjectMaterialsBeBaked(obj):
+            return
+
+        for matIndex, matSlot in enumerate(obj.material_slots):
+            mat = matSlot.material
+            if not self.canMaterialBeBaked(mat):
+                continue
+
+            obj.active_material_index = matIndex
+
+            matOutput, bsdf = self.findMaterialOutputNodeAndInput(mat)
+
+            if matOutput is None or bsdf is None:
+                continue
+
+            context = self.context
+
+            # Check if any channel needs baking.
+            # If any channels need to be baked, generate the UVs before processing any channels.
+            # This ensures that channels that would not need to be baked are still baked if the UVs change!
+            plan = self.planMaterialBake(context, obj, bsdf, matOutput)
+            if len(plan) > 0:
+                self.prepareBake(context, obj, bsdf, mat, self.canBsdfBeBaked(bsdf), prepareMaterial=False)
+
+                # Image inputs need to be baked to new UVs:
+                if UV_OVERRIDE in obj.data:
+                    plan = self.planMaterialBake(context, obj, bsdf, matOutput)
+
+            self.bakePlan[(obj.name, mat.name)] = plan
+
+            # Objects that share the baked material of another object don't bake anything:
+            bakedMaterialKey = self.getBakedMaterialKey(context, obj, mat)
+            if bakedMaterialKey not in self.plannedBakedMaterials:
+                self.plannedBakedMaterials.add(bakedMaterialKey)
+
+                for channel in plan:
+                    # Baked for another object with the same mesh already:
+                    sharedImageKey = self.getSharedBakedImageKey(context, obj, mat, channel)
+                    if sharedImageKey is not None:
+                        if sharedImageKey in self.plannedSharedImages:
+                            continue
+                        self.plannedSharedImages.add(sharedImageKey)
+
+                    self.mapsToBake += 1
+                    cost = self.predictBakeCost(context, obj, bsdf, channel)
+                    self.plannedBakeCosts[(obj.name, mat.name, channel)] = cost
+                    self.maxBakeProgress += cost
+
+            obj.material_slots[matIndex].material = mat
+
+    def getBakedMaterialKey(self, context, obj, mat):
+        '''
+        Objects with the same key can use the same baked material.
+        :return: Key of the baked material copy for the material on the object.
+        '''
+        if self.isMaterialBakedPerObject(context, mat):
+            return (mat.name, obj.name)
+
+        return self.getMeshBakedMaterialKey(obj, mat)
+
+    def getMeshBakedMaterialKey(self, obj, mat):
+        uvLayer = obj.data.uv_layers.active
+        return (mat.name, obj.data.name, uvLayer.name if uvLayer is not None else "")
+
+    def getBakedMaterialName(self, context, obj, mat):
+        if self.isMaterialBakedPerObject(context, mat):
+            return f"{mat.name}_{obj.name}_baked"
+        return f"{mat.name}_{obj.data.name}_baked"
+
+    def getSharedBakedImageKey(self, context, obj, mat, channel):
+        '''
+        Materials that are only baked per object because of ambient occlusion still share the images of the other
+        channels with objects that have the same mesh. Packed ORM textures contain the AO, so they are not shared.
+        :return: Key of the baked image of the channel that such objects share or None if it is baked for each object.
+        '''
+        if not self.isChannelBakeEnabled(context, AO_CHANNEL_NAME) or channel == AO_CHANNEL_NAME or \
+                self.isORMChannelPackingEnabled(context, channel):
+            return None
+
+        originalMat = self.getOriginalMaterial(mat)
+        if self.doesMaterialDependOnObject(originalMat):
+            return None
+
+        return self.getMeshBakedMaterialKey(obj, originalMat) + (channel,)
+
+    def getBakedImageName(self, context, obj, mat, channel):
+        '''
+        :param mat: The material copy that is baked or the original material when planning
+        '''
+        originalMat = self.getOriginalMaterial(mat)
+        if self.getSharedBakedImageKey(context, obj, mat, channel) is not None:
+            materialName = f"{originalMat.name}_{obj.data.name}_baked"
+        elif mat == originalMat:
+            materialName = self.getBakedMaterialName(context, obj, mat)
+        else:
+            materialName = mat.name
+        return f"{materialName}_{channel.lower()}"
+
+    def getOriginalMaterial(self, mat):
+        '''
+        :return: The material the baking copy was made from or the material itself if it is not a copy.
+        '''
+        if ORIGINAL_MATERIAL in mat and mat[ORIGINAL_MATERIAL] in bpy.data.materials:
+            return bpy.data.materials[mat[ORIGINAL_MATERIAL]]
+        return mat
+
+    def isMaterialBakedPerObject(self, context, mat):
+        '''
+        :return: True if the material bakes differently on each object, even if they have the same mesh.
+        '''
+        # Ambient occlusion depends on the surroundings of each object:
+        if self.isChannelBakeEnabled(context, AO_CHANNEL_NAME):
+            return True
 
-        for matIndex, matSlot in enumerate(obj.material_slots):
-            mat = matSlot.material
-            if not self.canMaterialBeBaked(mat):
-                continue
+        return self.doesMaterialDependOnObject(mat)
 
-            obj.active_material_index = matIndex
+    def doesMaterialDependOnObject(self, mat):
+        '''
+        :return: True if the material's node tree reads the object it is used on.
+        '''
+        if mat.node_tree is None:
+            return False
 
-            matOutput, bsdf = self.findMaterialOutputNodeAndInput(mat)
+        if mat not in self.objectDependentMaterials:
+            self.objectDependentMaterials[mat] = msb_doesShaderNodeTreeDependOnObject(mat.node_tree)
+        return self.objectDependentMaterials[mat]
 
-            if matOutput is None or bsdf is None:
+    def planMaterialBake(self, context, obj, bsdf, matOutput, newUVs=False):
+        '''
+        :param newUVs: Plan as if new UVs were generated for the object, without generating them
+        :return: Dictionary of enabled channels of the material that need baking and the reason why, in bake order.
+        '''
+        plan = {}
+        for channel in BAKED_CHANNELS:
+            if not self.isChannelBakeEnabled(context, channel):
                 continue
 
-            context = self.context
+            result = self.doesBSDFChannelNeedBaking(obj, bsdf, matOutput, channel, newUVs)
+            if result[0]:
+                plan[channel] = result[1]
 
-            # Check if any channel needs baking.
-            # If any channels need to be baked, generate the UVs before processing any channels.
-            # This ensures that channels that would not need to be baked are still baked if the UVs change!
-            for channel in BAKED_CHANNELS:
-                if not self.isChannelBakeEnabled(context, channel):
-                    continue
+        return plan
 
-                if self.doesBSDFChannelNeedBaking(obj, bsdf, matOutput, channel):
-                    self.prepareBake(context, obj, bsdf, mat, self.canBsdfBeBaked(bsdf), prepareMaterial=False)
-                    break
+    def getPlannedBakeReason(self, context, obj, mat, bsdf, matOutput, channel):
+        '''
+        :return: The reason why the channel needs baking from the bake plan or None if it doesn't need baking.
+        '''
+        planKey = (obj.name, mat.name)
+        if planKey not in self.bakePlan:
+            self.bakePlan[planKey] = self.planMaterialBake(context, obj, bsdf, matOutput)
 
-            for channel in BAKED_CHANNELS:
-                if not self.isChannelBakeEnabled(context, channel):
-                    continue
+        return self.bakePlan[planKey].get(channel)
 
-                if not self.doesBSDFChannelNeedBaking(obj, bsdf, matOutput, channel)[0]:
-                    continue
+    def getPlannedBakeType(self, bsdf, channel):
+        '''
+        :return: Type of bake bakeChannel would use for the channel or None if it can't be baked.
+        '''
+        if channel == AO_CHANNEL_NAME:
+            return 'AO'
+        if channel == DISPLACEMENT_CHANNEL_NAME or self.canBsdfBeBaked(bsdf):
+            return 'EMIT'
+        return channelNameToBakeName.get(channel)
 
-                self.mapsToBake += 1
-                self.maxBakeProgress += self.getObjectProgressWeight(obj)
+    def predictBakeCost(self, context, obj, bsdf, channel, dimensions=None):
+        '''
+        :return: Predicted seconds it takes to bake the channel from measurements of previous bakes.
+        '''
+        bakeType = self.getPlannedBakeType(bsdf, channel) or 'EMIT'
+        width, height = dimensions or self.getTextureDimensions(context, obj)
+        return self.costModel.predict(bakeType, context.scene.cycles.device, width * height,
+                                      self.getBakeSamples(context, bakeType), len(obj.data.polygons))
 
-            obj.material_slots[matIndex].material = mat
+    def getPlannedBakeCost(self, obj, mat, channel):
+        return self.plannedBakeCosts.get((obj.name, mat.name, channel), 0)
 
-    def getObjectProgressWeight(self, obj):
-        # The polygon count has some impact on baking duration but not a lot, so scale it down:
-        return max(1, int(len(obj.data.polygons) / 10000))
+    def recordBakeDuration(self, context, obj, bakeType, image, seconds):
+        '''
+        Adds the measured duration of a bake to the history the cost model is fitted to.
+        '''
+        width, height = image.size
+        self.costModel.record(bakeType, context.scene.cycles.device, width * height,
+                              self.getBakeSamples(context, bakeType), len(obj.data.polygons), seconds)
 
     def bakeObjectMaterials(self, obj, materials):
         context = self.context
@@ -519,6 +1867,16 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
                 self.finalMaterials.append(mat)
                 continue
 
+            # Use the baked material of another object with the same mesh and material:
+            bakedMaterialKey = self.getBakedMaterialKey(context, obj, mat)
+            if bakedMaterialKey in self.sharedBakedMaterials:
+                bakedMat = self.sharedBakedMaterials[bakedMaterialKey]
+                msb_log("'%s' has the same mesh and material as an object that was already baked, using '%s'.",
+                        obj.name, bakedMat.name)
+                self.finalMaterials.append(bakedMat)
+                bakedMaterials[mat] = bakedMat
+                continue
+
             obj.material_slots[matIndex].material = mat
             obj.active_material_index = matIndex
 
@@ -534,34 +1892,58 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
             self.deselectAllMaterialNodes(mat)
 
-            msb_log(f"********** Checking if '{mat.name}' on '{obj.name}' needs baked materials. **********")
+            msb_log("********** Checking if '%s' on '%s' needs baked materials. **********", mat.name, obj.name)
 
             # If any channel was baked, it will be on a new material,
             # store that to frame all new nodes after everything is baked:
             bakedMat = mat
+
+            # Bake scalar channels together in as few bake passes as possible:
+            packedChannels = []
+            if bakeSettings.pack_scalar_bakes:
+                packedChannels = self.getPackableChannels(context, obj, mat, bsdf, matOutput)
+                if len(packedChannels) > 1:
+                    yield BAKE_STEP
+                    context = self.context
+
+                    bakedMat = self.bakePackedChannels(context, obj, mat, bsdf, matOutput, packedChannels)
+                    self.invalidateRerouteTable(bakedMat.node_tree)
+
+                    yield
+                    context = self.context
+                else:
+                    packedChannels = []
+
             for channel in BAKED_CHANNELS:
-                if not self.isChannelBakeEnabled(context, channel):
+                if not self.isChannelBakeEnabled(context, channel) or channel in packedChannels:
                     continue
 
-                if bakeSettings.run_modal:
-                    yield
+                if self.getPlannedBakeReason(context, obj, mat, bsdf, matOutput, channel) is not None:
+                    yield BAKE_STEP
                     context = self.context
 
                 didBake, newMat = self.bakeBSDFChannelIfNeeded(context, obj, mat, bsdf, matOutput, channel)
                 if didBake:
                     bakedMat = newMat
 
-                if bakeSettings.run_modal:
-                    yield
-                    context = self.context
+                yield
+                context = self.context
 
             if bakedMat != mat:
-                self.cleanUpNodeTreeAndConnectBakedBSDF(bakedMat, matOutput)
+                if bakeSettings.pack_orm_texture:
+                    with self.trace.span("Pack ORM texture", object=obj.name, material=mat.name):
+                        self.packORMTexture(context, obj, bakedMat)
+
+                with self.trace.span("Clean up nodes", object=obj.name, material=mat.name):
+                    self.cleanUpNodeTreeAndConnectBakedBSDF(bakedMat, matOutput)
+                self.invalidateRerouteTable(bakedMat.node_tree)
 
             # Needed for restore afterwards:
             self.finalMaterials.append(bakedMat)
 
             bakedMaterials[mat] = bakedMat
+            if bakedMat != mat:
+                self.sharedBakedMaterials[bakedMaterialKey] = bakedMat
 
             obj.material_slots[matIndex].material = None
 
@@ -570,18 +1952,17 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             obj.hide_set(wasHiddenViewport)
             obj.hide_render = wasHiddenRender
 
-            if bakeSettings.run_modal:
-                yield
-                context = self.context
+            yield
+            context = self.context
 
         if UV_OVERRIDE in obj.data and len(obj.data.uv_layers) > 1:
-            msb_log(
-                f"New UVs were generated for '{obj.name}' for baking. Old UVs need to be deleted so the baked textures work correctly.")
+            msb_log("New UVs were generated for '%s' for baking. Old UVs need to be deleted so the baked textures work correctly.",
+                    obj.name)
             bakedUVLayer = obj.data[UV_OVERRIDE]
             for uvLayerIndex in range(len(obj.data.uv_layers) - 1, -1, -1):
                 uvLayer = obj.data.uv_layers[uvLayerIndex]
                 if uvLayer.name != bakedUVLayer:
-                    msb_log(f"Deleting uv layer: {uvLayer.name}")
+                    msb_log("Deleting uv layer: %s", uvLayer.name)
                     obj.data.uv_layers.remove(uvLayer)
             del obj.data[UV_OVERRIDE]
 
@@ -593,7 +1974,7 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
         self.selectObject(obj, context)
 
-        msb_log(f"********** Processing object '{obj.name}' **********")
+        msb_log("********** Processing object '%s' **********", obj.name)
 
         # We might want to support baking all materials into one:
         bakeIndividualMats = True
@@ -619,7 +2000,7 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             if throwExceptions:
                 raise e
             self.finalMaterials = materials
-            msb_log(f"Error: {e}", LogLevel.ERROR)
+            msb_log("Error: %s", e, level=LogLevel.ERROR)
 
         if bakeIndividualMats:
             # Restore material slots:
@@ -627,28 +2008,41 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
                 obj.material_slots[matIndex].material = mat
 
 
-    def enableAllCollectionsRecursively(self, col):
+    def showAllCollections(self, context):
         '''
-        Enables the view layer and all its children recursively.
+        Makes all collections visible, selectable and included in the view layer.
+        :return: Flags that were turned off by collection and layer collection pointer, for 'restoreCollections'.
         '''
-        if col.exclude:
-            col.exclude = False
-            self.excludedCollections.append(col.name)
+        hiddenFlags = {}
 
-        for child in col.children:
-            self.enableAllCollectionsRecursively(child)
+        for col in self.children_recursive(context.scene.collection):
+            # Collections can be linked into more than one parent:
+            if col.as_pointer() in hiddenFlags:
+                continue
+
+            flags = tuple(x for x in ("hide_viewport", "hide_render", "hide_select") if getattr(col, x))
+            for flag in flags:
+                setattr(col, flag, False)
+            hiddenFlags[col.as_pointer()] = flags
+
+        for layerCol in self.children_recursive(context.view_layer.layer_collection):
+            if layerCol.exclude:
+                layerCol.exclude = False
+                hiddenFlags[layerCol.as_pointer()] = ("exclude",)
+
+        return {key: flags for key, flags in hiddenFlags.items() if len(flags) > 0}
 
-    def restoreAllCollectionsRecursively(self, col):
+    def restoreCollections(self, context, hiddenFlags):
         '''
-        Disables the view layer and all its children recursively if
-        they have been enabled by 'enableAllCollectionsRecursively'.
+        Turns the flags that were turned off by 'showAllCollections' back on.
         '''
-        if col.name in self.excludedCollections:
-            col.exclude = True
-            self.excludedCollections.remove(col.name)
+        for col in itertools.chain(self.children_recursive(context.scene.collection),
+                                   self.children_recursive(context.view_layer.layer_collection)):
+            if len(hiddenFlags) == 0:
+                break
 
-        for child in col.children:
-            self.restoreAllCollectionsRecursively(child)
+            for flag in hiddenFlags.pop(col.as_pointer(), ()):
+                setattr(col, flag, True)
 
     def children_recursive(self, col):
         for child in col.children:
@@ -670,94 +2064,373 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         selectedObjects = context.selected_objects
 
         self.objectsProcessedForBaking = []
+
+        # Channels that need baking and why for each (object name, material name), filled before baking:
+        self.bakePlan = {}
+
+        # Material copies by getBakedMaterialKey, objects with the same mesh and material share one baked material:
+        self.bakedMaterialCopies = {}
+        self.sharedBakedMaterials = {}
+        self.plannedBakedMaterials = set()
+        # Baked images by getSharedBakedImageKey, for objects that don't share their baked material:
+        self.sharedBakedImages = {}
+        self.plannedSharedImages = set()
         bakeSettings = context.scene.meshsync_bake_settings
         bakeSettings.bake_progress = 0
 
+        objectsToBake = self.getObjectsToBake(context)
+        if objectsToBake is None:
+            return {'CANCELLED'}
+
+        msb_setBakeInProgress(True)
+
+        # Put back in 'finally', so the file is also restored when baking fails or is cancelled:
+        self.originalSceneSettings = []
+        hiddenCollectionFlags = {}
+        finished = False
+        try:
+            self.setupRenderSettings(context)
+
+            # Make sure all collections are visible, baking won't work for objects in hidden collections:
+            hiddenCollectionFlags = self.showAllCollections(context)
+
+            self.maxBakeProgress = 0
+            self.currentBakeProgress = 0
+            self.bakedCost = 0
+
+            # Predicted seconds for each (object name, material name, channel) that is baked:
+            self.plannedBakeCosts = {}
+
+            # Keeps track of applied modifiers to re-use the object
+            # data instead of applying them multiple times and generating unique objects:
+            self.modifierDeDuplicationInfo = {}
+            self.modifierHashCache = {}
+
+            # Texture dimensions per (mesh, active UV layer name), so texel density is only calculated once per mesh:
+            self.textureDimensionsCache = {}
+
+            # Arrays for reading mesh and image data, released after baking:
+            self.bufferPool = BakeBufferPool()
+            self.imageWriter = BakedImageWriter(self.trace)
+
+            # Hashes used to find baked textures that don't need to be baked again:
+            self.meshHashCache = {}
+            self.materialHashCache = {}
+            self.loadBakeCache(context)
+
+            bakeSettings.bake_progress = 0.001
+
+            if bakeSettings.run_modal:
+                self.incrementProgress(context, "Preparing", mode = "RESET")
+            else:
+                self.incrementProgress(context, "Blender will be frozen while baking. Please check the console for progress.", mode = "RESET")
+
+            # Ensure UI updates:
+            yield REDRAW_STEP
+
+            for obj in objectsToBake:
+                with self.trace.span("Prepare object", object=obj.name):
+                    self.preBakeObject(obj)
+                yield
+
+            for obj in objectsToBake:
+                for _ in self.bakeObject(obj):
+                    yield
+
+            # The baked images need to be on disk before meshsync sends them:
+            with self.trace.span("Wait for image writes"):
+                self.finishImageWrites()
+
+            self.saveBakeCache(context)
+            self.costModel.save()
+            self.trace.save()
+            self.bufferPool.clear()
+            finished = True
+        finally:
+            self.restoreOriginalSettings(context)
+            bakeSettings.bake_progress = 0
+            context.view_layer.objects.active = activeObject
+            for o in context.selected_objects:
+                o.select_set(False)
+            for o in selectedObjects:
+                o.select_set(True)
+            self.restoreCollections(context, hiddenCollectionFlags)
+
+            # Objects that were not finished are still outdated:
+            msb_setBakeInProgress(False, objectsToBake if finished else None)
+
+    def getObjectsToBake(self, context):
+        '''
+        :return: Objects to bake based on the bake settings or None if there is nothing to bake.
+        '''
+        if len(self.object_names) > 0:
+            return [context.scene.objects[name] for name in json.loads(self.object_names) if name in context.scene.objects]
+
+        bakeSettings = context.scene.meshsync_bake_settings
         bakeSelection = bakeSettings.bake_selection
 
+        objects = None
         if bakeSelection == 'ALL':
-            objectsToBake = context.scene.objects
+            objects = context.scene.objects
         elif bakeSelection == 'SELECTED':
             if len(context.selected_objects) > 0:
-                objectsToBake = selectedObjects
-            else:
-                msb_log("No objects selected, nothing to bake!", LogLevel.ERROR)
-                return {'CANCELLED'}
-
-        self.setupRenderSettings(context)
+                objects = context.selected_objects
 
-        # Make sure all collections are visible, baking won't work for objects in hidden collections:
-        hiddenCollectionsViewport = []
-        hiddenCollectionsRender = []
-        hideSelectCollections = []
-        self.excludedCollections = []
+        if objects is None:
+            msb_log("No objects selected, nothing to bake!", level=LogLevel.ERROR)
+            return None
 
-        for col in self.children_recursive(context.scene.collection):
-            if col.hide_viewport:
-                col.hide_viewport = False
-                hiddenCollectionsViewport.append(col.name)
-            if col.hide_render:
-                col.hide_render = False
-                hiddenCollectionsRender.append(col.name)
-            if col.hide_select:
-                col.hide_select = False
-                hideSelectCollections.append(col.name)
-
-        for col in context.view_layer.layer_collection.children:
-            self.enableAllCollectionsRecursively(col)
-
-        self.maxBakeProgress = 0
-        self.currentBakeProgress = 0
-
-        # Keeps track of applied modifiers to re-use the object
-        # data instead of applying them multiple times and generating unique objects:
-        self.modifierDeDuplicationInfo = {}
+        if bakeSettings.incremental_bake:
+            objects = [obj for obj in objects if msb_isBakeOutdated(obj)]
+            if len(objects) == 0:
+                msb_log("Nothing changed since the last bake, nothing to bake!", level=LogLevel.NORMAL)
+                return None
+            msb_log("Baking %s objects that changed since the last bake.", len(objects), level=LogLevel.NORMAL)
 
-        bakeSettings.bake_progress = 0.001
+        return objects
 
-        if bakeSettings.run_modal:
-            self.incrementProgress(context, "Preparing", mode = "RESET")
+    def estimateObjectBakeCost(self, context, obj):
+        '''
+        :return: Predicted seconds to bake all enabled channels of the materials on the object, before its UVs are known.
+        '''
+        bakeSettings = context.scene.meshsync_bake_settings
+        if bakeSettings.baked_texture_dimensions == 'PIXELS':
+            dimensions = bakeSettings.bakedTextureSize
         else:
-            self.incrementProgress(context, "Blender will be frozen while baking. Please check the console for progress.", mode = "RESET")
+            dimensions = (bakeSettings.texel_density_limit, bakeSettings.texel_density_limit)
 
-        # Ensure UI updates:
-        for i in range(100):
-            yield
+        materials = {x.material for x in obj.material_slots if self.canMaterialBeBaked(x.material)}
+        cost = 0
+        for mat in materials:
+            _, bsdf = self.findMaterialOutputNodeAndInput(mat)
+            if bsdf is None:
+                continue
+            for channel in BAKED_CHANNELS:
+                if self.isChannelBakeEnabled(context, channel):
+                    cost += self.predictBakeCost(context, obj, bsdf, channel, dimensions)
+        return cost
+
+    def partitionObjectsForWorkers(self, context, objects, numWorkers):
+        '''
+        Splits the objects into lists of object names with about the same amount of baking work.
+        Objects sharing a mesh end up in the same list, so the mesh is only processed by one worker.
+        '''
+        objectsByMesh = {}
+        for obj in objects:
+            if msb_canObjectMaterialsBeBaked(obj):
+                objectsByMesh.setdefault(obj.data, []).append(obj)
 
-        for obj in objectsToBake:
-            self.preBakeObject(obj)
+        def getWeight(objectsWithMesh):
+            return sum(self.estimateObjectBakeCost(context, obj) for obj in objectsWithMesh)
 
-        if bakeSettings.run_modal:
-            yield
+        partitions = [[] for _ in range(numWorkers)]
+        weights = [0] * numWorkers
 
-        for obj in objectsToBake:
-            for _ in self.bakeObject(obj):
-                yield
+        # Largest first, always into the list with the least work:
+        for objectsWithMesh in sorted(objectsByMesh.values(), key=getWeight, reverse=True):
+            index = weights.index(min(weights))
+            partitions[index].extend(obj.name for obj in objectsWithMesh)
+            weights[index] += getWeight(objectsWithMesh)
+
+        return [x for x in partitions if len(x) > 0]
+
+    def bakeInWorkers(self):
+        '''
+        Bakes the objects in background blender processes using a copy of the current file
+        and merges the baked meshes and materials back into this file afterwards.
+        '''
+        context = self.context
+        bakeSettings = context.scene.meshsync_bake_settings
+
+        objectsToBake = self.getObjectsToBake(context)
+        if objectsToBake is None:
+            return
+
+        partitions = self.partitionObjectsForWorkers(context, objectsToBake, bakeSettings.bake_processes)
+        if len(partitions) == 0:
+            msb_log("No objects that can be baked, nothing to bake!", level=LogLevel.ERROR)
+            return
+
+        msb_setBakeInProgress(True)
+
+        workDir = tempfile.mkdtemp(prefix="meshsync_bake_")
+        logFiles = []
+        try:
+            yield from self.runWorkers(workDir, partitions, logFiles)
+        finally:
+            # Runs when the bake finishes, fails or is cancelled and the task is closed:
+            for process in self.workerProcesses:
+                if process.poll() is None:
+                    process.terminate()
+                    process.wait()
+            self.workerProcesses = []
 
-        # Restore state:
-        self.restoreOriginalSettings(context)
+            for logFile in logFiles:
+                logFile.close()
+
+            shutil.rmtree(workDir, ignore_errors=True)
+
+            # Already done with the merged objects when the bake finished, objects that were not merged are still outdated:
+            msb_setBakeInProgress(False)
+
+    def runWorkers(self, workDir, partitions, logFiles):
+        '''
+        Starts a worker process for each partition, waits for them and merges their results.
+        :param logFiles: Log files opened for the workers are added to this, the caller closes them
+        '''
+        context = self.context
         bakeSettings = context.scene.meshsync_bake_settings
+
+        sceneCopyPath = os.path.join(workDir, "scene.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=sceneCopyPath, copy=True)
+
+        # Don't let every process use all cores:
+        threads = max(1, (os.cpu_count() or 1) // len(partitions))
+
+        jobs = []
+        for index, objectNames in enumerate(partitions):
+            job = {"objects": objectNames,
+                   "threads": threads,
+                   "output": os.path.join(workDir, f"worker_{index}.blend"),
+                   "manifest": os.path.join(workDir, f"worker_{index}.json"),
+                   "log": os.path.join(workDir, f"worker_{index}.log"),
+                   "trace": os.path.join(workDir, f"worker_{index}_trace.json")
+                            if len(bakeSettings.trace_file) > 0 else ""}
+
+            jobPath = os.path.join(workDir, f"job_{index}.json")
+            with open(jobPath, "w") as f:
+                json.dump(job, f)
+
+            logFile = open(job["log"], "w")
+            expression = f"import {__package__}.unity_mesh_sync_baking as b; b.msb_runBakeWorker({jobPath!r})"
+            process = subprocess.Popen([bpy.app.binary_path, "-b", sceneCopyPath, "--python-expr", expression],
+                                       stdout=logFile, stderr=subprocess.STDOUT)
+
+            jobs.append(job)
+            logFiles.append(logFile)
+            self.workerProcesses.append(process)
+
+        msb_log("Baking %s objects in %s processes.", sum(len(x) for x in partitions), len(jobs), level=LogLevel.NORMAL)
+
+        bakeSettings.bake_progress = 0.001
+        self.incrementProgress(context, f"Baking in {len(jobs)} background processes", mode="RESET")
+
+        while True:
+            runningProcesses = [x for x in self.workerProcesses if x.poll() is None]
+
+            finishedCount = len(jobs) - len(runningProcesses)
+            bakeSettings.bake_progress = max(0.001, 100.0 * finishedCount / len(jobs))
+            bakeSettings.bake_maps_remaining = f"Processes finished: {finishedCount}/{len(jobs)}"
+
+            if len(runningProcesses) == 0:
+                break
+
+            # Don't keep the main thread busy while waiting:
+            try:
+                runningProcesses[0].wait(timeout=0.1)
+            except subprocess.TimeoutExpired:
+                pass
+
+            yield REDRAW_STEP
+            context = self.context
+            bakeSettings = context.scene.meshsync_bake_settings
+
+        for logFile in logFiles:
+            logFile.flush()
+
+        self.incrementProgress(context, "Merging baked materials", mode="RESET")
+
+        mergedObjects = []
+        for job, process in zip(jobs, self.workerProcesses):
+            if process.returncode != 0 or not os.path.exists(job["manifest"]):
+                msb_log("Bake process for %s objects failed.", len(job['objects']), level=LogLevel.ERROR)
+                self.logWorkerOutput(job)
+                continue
+
+            with self.trace.span("Merge worker result", objects=len(job["objects"])):
+                self.mergeWorkerResult(context, job)
+            if len(job["trace"]) > 0:
+                self.trace.addEvents(job["trace"])
+            mergedObjects.extend(context.scene.objects[name] for name in job["objects"] if name in context.scene.objects)
+
+        self.trace.save()
+
+        # Workers don't register the pixels of ORM textures, this process sends them:
+        msb_registerPackedBakedImages({slot.material for obj in mergedObjects for slot in obj.material_slots})
+
         bakeSettings.bake_progress = 0
-        context.view_layer.objects.active = activeObject
-        for o in context.selected_objects:
-            o.select_set(False)
-        for o in selectedObjects:
-            o.select_set(True)
-        for hiddenCollection in hiddenCollectionsViewport:
-            for col in self.children_recursive(context.scene.collection):
-                if col.name == hiddenCollection:
-                    col.hide_viewport = True
-        for hiddenCollection in hiddenCollectionsRender:
-            for col in self.children_recursive(context.scene.collection):
-                if col.name == hiddenCollection:
-                    col.hide_render = True
-        for hideSelectCol in hideSelectCollections:
-            for col in self.children_recursive(context.scene.collection):
-                if col.name == hideSelectCol:
-                    col.hide_select = True
-
-        for col in context.view_layer.layer_collection.children:
-            self.restoreAllCollectionsRecursively(col)
+
+        msb_setBakeInProgress(False, mergedObjects)
+
+    def logWorkerOutput(self, job):
+        '''
+        Logs the output of a failed worker, its log file is deleted with the work directory.
+        '''
+        try:
+            with open(job["log"], errors="replace") as f:
+                lines = f.readlines()
+        except OSError as e:
+            msb_log("Could not read the log of the bake process: %s", e, level=LogLevel.ERROR)
+            return
+
+        msb_log(lambda: "Output of the bake process:\n" + "".join(lines[-WORKER_LOG_LINES:]), level=LogLevel.ERROR)
+
+    def mergeWorkerResult(self, context, job):
+        '''
+        Replaces meshes and materials of the objects baked by a worker with the worker's result.
+        '''
+        with open(job["manifest"]) as f:
+            manifest = json.load(f)
+
+        objects = {}
+        for name in manifest:
+            if name in context.scene.objects:
+                objects[name] = context.scene.objects[name]
+
+        # Remove previous bakes so the merged materials keep their names:
+        for obj in objects.values():
+            msb_revertBakedMaterials(obj)
+
+        meshNames = sorted({x["mesh"] for x in manifest.values()})
+        materialNames = sorted({name for x in manifest.values() for name in x["bakedMaterials"]})
+
+        with bpy.data.libraries.load(job["output"], link=False) as (dataFrom, dataTo):
+            dataTo.meshes = meshNames
+            dataTo.materials = materialNames
+
+        meshes = dict(zip(meshNames, dataTo.meshes))
+        materials = dict(zip(materialNames, dataTo.materials))
+
+        for mat in materials.values():
+            if mat is not None:
+                mat.use_fake_user = False
+
+        for name, obj in objects.items():
+            objectInfo = manifest[name]
+
+            mesh = meshes.get(objectInfo["mesh"])
+            if mesh is None:
+                continue
+
+            # Modifiers the worker applied are part of the mesh now:
+            for mod in obj.modifiers[:]:
+                if mod.name not in objectInfo["modifiers"]:
+                    obj.modifiers.remove(mod)
+
+            obj.data = mesh
+
+            for matIndex, matName in enumerate(objectInfo["materials"]):
+                if matIndex >= len(obj.material_slots):
+                    break
+
+                if matName in materials:
+                    mat = materials[matName]
+                elif matName is not None and matName in bpy.data.materials:
+                    mat = bpy.data.materials[matName]
+                else:
+                    mat = None
+
+                obj.material_slots[matIndex].material = mat
 
     def checkIfUVMapIsNotUV0(self, obj, uvMapName, channel):
         '''
@@ -771,14 +2444,14 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         else:
             # If there is a UV map set, we need to bake if the object has other UV maps we could use instead:
             if len(obj.data.uv_layers) == 0:
-                msb_log(
-                    f"Cannot bake '{obj.name}' because it does not have any UV channels but the input for '{channel}' needs a '{uvMapName}' UV map.")
+                msb_log("Cannot bake '%s' because it does not have any UV channels but the input for '%s' needs a '%s' UV map.",
+                        obj.name, channel, uvMapName)
                 return [False]
 
             # If this is UV0 of the object, don't bake:
             if obj.data.uv_layers.find(uvMapName) == -1:
-                msb_log(
-                    f"Cannot bake '{obj.name}' because it does not have the UV map {uvMapName} that the input for '{channel}' needs.")
+                msb_log("Cannot bake '%s' because it does not have the UV map %s that the input for '%s' needs.",
+                        obj.name, uvMapName, channel)
                 return [False]
 
             if obj.data.uv_layers[0].name == uvMapName:
@@ -786,20 +2459,20 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
             return [True, "Image UV input is not UV0."]
 
-    def doesImageNodeNotUseUv0(self, obj, link, imageNode, channel):
+    def doesImageNodeNotUseUv0(self, obj, link, imageNode, channel, newUVs=False):
         if link.from_socket.name != 'Color':
             return [True, f"Not using Color output of image node."]
 
-        uvInputSocket = imageNode.inputs['Vector']
+        uvInputLink = self.getInputLink(imageNode.inputs['Vector'])
 
-        if UV_OVERRIDE in obj.data:
-            return [True, f"UVs have changed, need to bake to new UVs."]
+        if newUVs or UV_OVERRIDE in obj.data:
+            return [True, "UVs have changed, need to bake to new UVs."]
 
-        if len(uvInputSocket.links) == 0:
+        if uvInputLink is None:
             # It's an image connected to the socket with default UVs, don't bake that:
             return [False]
         else:
-            uvCoordNode = uvInputSocket.links[0].from_node
+            uvCoordNode = uvInputLink.from_node
             if uvCoordNode.type != 'UVMAP':
                 return [True, "Image input is not a UV map."]
 
@@ -807,28 +2480,28 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
             return self.checkIfUVMapIsNotUV0(obj, uvMapName, channel)
 
-    def handleDisplacementNode(self, obj, link, channel, displacementNode):
-        heightInput = displacementNode.inputs['Height']
+    def handleDisplacementNode(self, obj, link, channel, displacementNode, newUVs=False):
+        heightLink = self.getInputLink(displacementNode.inputs['Height'])
 
-        if len(heightInput.links) == 0:
+        if heightLink is None:
             return [False]
 
-        displacementInputSocket = self.traverseReroutes(heightInput.links[0].from_socket)
+        displacementInputSocket = self.traverseReroutes(heightLink.from_socket)
         if displacementInputSocket is None:
             return [False]
 
-        return self.handleInputToBake(obj, channel, displacementInputSocket)
+        return self.handleInputToBake(obj, channel, displacementInputSocket, newUVs)
 
-    def handleImageNode(self, obj, link, channel, imageNode):
+    def handleImageNode(self, obj, link, channel, imageNode, newUVs=False):
         if imageNode.image.source == 'TILED':
             return [True, "Image is a UDIM tile that needs to be baked."]
 
         if channel == 'Normal':
             return [True, "Normals require a normal map node as input."]
 
-        return self.doesImageNodeNotUseUv0(obj, link, imageNode, channel)
+        return self.doesImageNodeNotUseUv0(obj, link, imageNode, channel, newUVs)
 
-    def handleNormalNode(self, obj, link, channel, normalMapNode):
+    def handleNormalNode(self, obj, link, channel, normalMapNode, newUVs=False):
         if channel != 'Normal':
             return [True, "The 'normal map' node is only supported as input for normals."]
 
@@ -836,31 +2509,31 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         if uvmapCheck[0]:
             return uvmapCheck
 
-        strengthInput = normalMapNode.inputs['Strength']
-        if len(strengthInput.links) > 0:
-            strengthInputNode = strengthInput.links[0].from_node
+        strengthLink = self.getInputLink(normalMapNode.inputs['Strength'])
+        if strengthLink is not None:
+            strengthInputNode = strengthLink.from_node
             if strengthInputNode.type != 'VALUE':
                 return [True, "Normal map strength input is not a constant."]
 
-        colorInput = normalMapNode.inputs['Color']
-        if len(colorInput.links) > 0:
-            colorInputNode = colorInput.links[0].from_node
+        colorLink = self.getInputLink(normalMapNode.inputs['Color'])
+        if colorLink is not None:
+            colorInputNode = colorLink.from_node
             if colorInputNode.type != 'TEX_IMAGE':
                 return [True, "Normal map input is not an image."]
 
-            if colorInput.links[0].from_socket.name != 'Color':
+            if colorLink.from_socket.name != 'Color':
                 return [True, "Non-color channel of texture is used as normal map input."]
 
-            return self.doesImageNodeNotUseUv0(obj, colorInput.links[0], colorInputNode, channel)
+            return self.doesImageNodeNotUseUv0(obj, colorLink, colorInputNode, channel, newUVs)
 
         return [False]
 
-    def handleInputToBake(self, obj, channel, inputSocket):
+    def handleInputToBake(self, obj, channel, inputSocket, newUVs=False):
         # If there's nothing connected to the socket, we can use the socket's default value.
-        if len(inputSocket.links) == 0:
+        link = self.getInputLink(inputSocket)
+        if link is None:
             return [False]
 
-        link = inputSocket.links[0]
         nodeConnectedToChannelSocket = self.traverseReroutes(link.from_node)
 
         if nodeConnectedToChannelSocket is None:
@@ -873,28 +2546,29 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             return [False]
 
         if type == 'TEX_IMAGE':
-            return self.handleImageNode(obj, link, channel, nodeConnectedToChannelSocket)
+            return self.handleImageNode(obj, link, channel, nodeConnectedToChannelSocket, newUVs)
         elif type == 'NORMAL_MAP':
-            return self.handleNormalNode(obj, link, channel, nodeConnectedToChannelSocket)
+            return self.handleNormalNode(obj, link, channel, nodeConnectedToChannelSocket, newUVs)
         elif type == 'DISPLACEMENT':
-            return self.handleDisplacementNode(obj, link, channel, nodeConnectedToChannelSocket)
+            return self.handleDisplacementNode(obj, link, channel, nodeConnectedToChannelSocket, newUVs)
 
         return [True, "Node input is procedural."]
 
     def doesBSDFChannelNeedBaking(self, obj, bsdf, matOutput,
-                                  channel: str) -> list:
+                                  channel: str, newUVs=False) -> list:
         if channel == AO_CHANNEL_NAME:
             return [True, "Ambient occlusion requires baking."]
 
         if channel == DISPLACEMENT_CHANNEL_NAME:
             displacementInput = matOutput.inputs['Displacement']
-            if len(displacementInput.links) == 0:
+            displacementLink = self.getInputLink(displacementInput)
+            if displacementLink is None:
                 return [False]
-            if displacementInput.links[0].from_node.type != 'DISPLACEMENT':
+            if displacementLink.from_node.type != 'DISPLACEMENT':
                 # Input is not from a displacement node, we can't bake that:
                 return [False]
 
-            return self.handleInputToBake(obj, channel, displacementInput)
+            return self.handleInputToBake(obj, channel, displacementInput, newUVs)
 
         if bsdf is None:
             return [True, "Material output is not connected to a shader."]
@@ -908,13 +2582,14 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
         inputSocket = bsdf.inputs[bsdfInputName]
 
-        return self.handleInputToBake(obj, channel, inputSocket)
+        return self.handleInputToBake(obj, channel, inputSocket, newUVs)
 
     def bakeBSDFChannelIfNeeded(self, context, obj, mat, bsdf, matOutput, channel):
-        result = self.doesBSDFChannelNeedBaking(obj, bsdf, matOutput, channel)
-        if result[0]:
-            msb_log(f"Baking {channel} for '{obj.name}'. Reason: {result[1]}")
+        reason = self.getPlannedBakeReason(context, obj, mat, bsdf, matOutput, channel)
+        if reason is not None:
+            msb_log("Baking %s for '%s'. Reason: %s", channel, obj.name, reason)
             bakedMat = self.bakeChannel(context, obj, mat, bsdf, matOutput, channel)
+            self.invalidateRerouteTable(bakedMat.node_tree)
             return True, bakedMat
 
         return False, mat
@@ -931,38 +2606,55 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             # For each face, get the area in space and UV space
             mesh = obj.data
 
+            # The dimensions only depend on the mesh and its UVs, so they can be reused for other channels and materials:
+            cacheKey = (mesh, mesh.uv_layers.active.name)
+            if cacheKey in self.textureDimensionsCache:
+                return self.textureDimensionsCache[cacheKey]
+
             import numpy as np
             uv_layer = mesh.uv_layers.active.data
 
-            def polyArea(x, y):
-                return 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+            numPolygons = len(mesh.polygons)
+            numLoops = len(mesh.loops)
 
-            # Add up uvArea / polygon area and divide by number of polygons to get the average ratio
-            # and calculate the texture dimensions based on the texel density from that:
-            ratioSum = 0
+            # Read all the data we need in one go instead of accessing each polygon from python:
+            loopStarts = self.bufferPool.get("loopStarts", numPolygons, np.int32)
+            loopTotals = self.bufferPool.get("loopTotals", numPolygons, np.int32)
+            polyAreas = self.bufferPool.get("polyAreas", numPolygons)
+            uvs = self.bufferPool.get("uvs", numLoops * 2)
+
+            mesh.polygons.foreach_get("loop_start", loopStarts)
+            mesh.polygons.foreach_get("loop_total", loopTotals)
+            mesh.polygons.foreach_get("area", polyAreas)
+            uv_layer.foreach_get("uv", uvs)
 
-            for poly in mesh.polygons:
-                # calculate UV area:
-                x = []
-                y = []
+            # reduceat needs the polygons in loop order:
+            if numPolygons > 1 and np.any(loopStarts[1:] < loopStarts[:-1]):
+                order = np.argsort(loopStarts, kind='stable')
+                loopStarts = loopStarts[order]
+                loopTotals = loopTotals[order]
+                polyAreas = polyAreas[order]
 
-                # Put vertices of the polygon into lists to calculate the UV area:
-                for loop_index in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                    uv = uv_layer[loop_index].uv
-                    x.append(uv[0])
-                    y.append(uv[1])
+            x = uvs[0::2].astype(np.float64)
+            y = uvs[1::2].astype(np.float64)
 
-                uvArea = polyArea(x, y)
-                pArea = poly.area
+            # Shoelace formula: each loop is paired with the previous loop of the same polygon,
+            # the first loop of a polygon wraps around to the polygon's last loop:
+            previousLoop = np.arange(numLoops, dtype=np.int64) - 1
+            previousLoop[loopStarts] = loopStarts + loopTotals - 1
 
-                # Avoid division by 0:
-                if pArea <= 0.000001:
-                    pArea = 0.001
+            cross = x * y[previousLoop] - y * x[previousLoop]
+            uvAreas = 0.5 * np.abs(np.add.reduceat(cross, loopStarts))
 
-                ratioSum += math.sqrt(uvArea / pArea)
+            # Avoid division by 0:
+            polyAreas = np.where(polyAreas <= 0.000001, 0.001, polyAreas)
+
+            # Add up uvArea / polygon area and divide by number of polygons to get the average ratio
+            # and calculate the texture dimensions based on the texel density from that:
+            ratioSum = float(np.sum(np.sqrt(uvAreas / polyAreas)))
 
             # Calculate average texel density for each face:
-            avgDensity = ratioSum / len(mesh.polygons)
+            avgDensity = ratioSum / numPolygons
 
             # Calculate how large the texture needs to be to get the desired texel density:
             dims = max(1, int(bakeSettings.texel_density / avgDensity))
@@ -972,10 +2664,138 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
             dims = min(dims, bakeSettings.texel_density_limit)
             dims = (dims, dims)
-            msb_log(f"Calculated texture size: {dims}", LogLevel.VERBOSE)
+            msb_log("Calculated texture size: %s", dims, level=LogLevel.VERBOSE)
+
+            self.textureDimensionsCache[cacheKey] = dims
 
             return dims
 
+    def invalidateMeshCaches(self, mesh):
+        '''
+        Removes all cached texture dimensions and hashes of the given mesh, needed when its UVs change.
+        '''
+        for cacheKey in [key for key in self.textureDimensionsCache if key[0] == mesh]:
+            del self.textureDimensionsCache[cacheKey]
+
+        self.meshHashCache.pop(mesh, None)
+
+    def loadBakeCache(self, context):
+        '''
+        Loads the hashes of the textures in the baked texture path.
+        '''
+        self.bakeCache = {}
+        self.removedBakeCacheEntries = set()
+
+        cachePath = os.path.join(context.scene.meshsync_bake_settings.bakedTexturesPath, BAKE_CACHE_FILE_NAME)
+        if not os.path.isfile(cachePath):
+            return
+
+        try:
+            with open(cachePath) as f:
+                self.bakeCache = json.load(f)
+        except Exception as e:
+            msb_log("Could not read bake cache '%s': %s", cachePath, e, level=LogLevel.ERROR)
+
+    def saveBakeCache(self, context):
+        '''
+        Writes the hashes of the baked textures. Entries written by other processes in the meantime are kept.
+        '''
+        cachePath = os.path.join(context.scene.meshsync_bake_settings.bakedTexturesPath, BAKE_CACHE_FILE_NAME)
+
+        try:
+            bakeCache = {}
+            if os.path.isfile(cachePath):
+                with open(cachePath) as f:
+                    bakeCache = json.load(f)
+
+            for fileName in self.removedBakeCacheEntries:
+                bakeCache.pop(fileName, None)
+            bakeCache.update(self.bakeCache)
+
+            with open(cachePath, "w") as f:
+                json.dump(bakeCache, f, indent=1)
+        except Exception as e:
+            msb_log("Could not write bake cache '%s': %s", cachePath, e, level=LogLevel.ERROR)
+
+    def getBakeCacheKey(self, context, obj, mat, channel, bakeType):
+        '''
+        :return: Hash of everything that affects the baked texture of the channel.
+        '''
+        # AO depends on the surrounding scene, don't reuse that:
+        if channel == AO_CHANNEL_NAME:
+            return None
+
+        mesh = obj.data
+        if mesh not in self.meshHashCache:
+            hasher = hashlib.blake2b(digest_size=20)
+            msb_hashMesh(hasher, mesh, self.bufferPool)
+            self.meshHashCache[mesh] = hasher.hexdigest()
+
+        # The material copy is changed during baking, use the original:
+        originalMat = self.getOriginalMaterial(mat)
+
+        # The bake depends on the object's transform, name etc. which are not part of the key:
+        if self.doesMaterialDependOnObject(originalMat):
+            return None
+
+        if originalMat not in self.materialHashCache:
+            hasher = hashlib.blake2b(digest_size=20)
+            try:
+                msb_hashNodeTree(hasher, originalMat.node_tree)
+                self.materialHashCache[originalMat] = hasher.hexdigest()
+            except UnhashableValueError as e:
+                msb_log("Not caching bakes of '%s': %s", originalMat.name, e, level=LogLevel.VERBOSE)
+                self.materialHashCache[originalMat] = None
+
+        if self.materialHashCache[originalMat] is None:
+            return None
+
+        scene = context.scene
+        settings = (BAKE_CACHE_VERSION,
+                    channel,
+                    bakeType,
+                    tuple(self.getTextureDimensions(context, obj)),
+                    self.getBakeSamples(context, bakeType),
+                    scene.cycles.use_adaptive_sampling and scene.cycles.adaptive_threshold,
+                    scene.render.bake.margin,
+                    self.getChannelColourSpace(channel))
+
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(self.meshHashCache[mesh].encode())
+        hasher.update(self.materialHashCache[originalMat].encode())
+        hasher.update(repr(settings).encode())
+        return hasher.hexdigest()
+
+    def loadCachedImage(self, context, name, cacheKey, colorSpace):
+        '''
+        :return: The previously baked image if it was baked with the same cache key, otherwise None.
+        '''
+        bakeSettings = context.scene.meshsync_bake_settings
+        if cacheKey is None or not bakeSettings.use_bake_cache or not bakeSettings.save_baked_images:
+            return None
+
+        imageName = name.replace(" ", "_")
+        fileName = imageName + self.getBakedImageExtension(context)
+        filepath = os.path.join(context.scene.meshsync_bake_settings.bakedTexturesPath, fileName)
+
+        if self.bakeCache.get(fileName) != cacheKey or not os.path.isfile(filepath):
+            return None
+
+        existingImageIndex = bpy.data.images.find(imageName)
+        if existingImageIndex >= 0:
+            bpy.data.images.remove(bpy.data.images[existingImageIndex])
+
+        image = bpy.data.images.load(filepath, check_existing=False)
+        image.name = imageName
+        image.colorspace_settings.name = colorSpace
+
+        # Pixels from an earlier bake would be sent instead of the file otherwise:
+        msb_unregisterBakedImage(image.name)
+
+        msb_log("'%s' did not change since it was last baked, reusing it.", fileName)
+
+        return image
+
     def createImage(self, context, obj, name, colorSpace, alpha=False):
         imageName = name.replace(" ", "_")
 
@@ -1010,38 +2830,17 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
                 raise Exception(
                     f"Object: '{obj.name}' has no UVs. Automatically generating UVs is disabled, so this object cannot be baked!")
         else:
-            # Even though there are UVs, they might not be useful for baking.
-            # Make sure they're not all in the same spot and in the 0..1 range:
-            # Note: This does not prevent overlapping UVs or faces with no area but that's up to the user to fix:
-            import numpy as np
-            uvOutOfBounds = False
-            for i in range(len(obj.data.uv_layers)):
-                uv_map = obj.data.uv_layers[i]
-                if uv_map.active:
-                    nl = len(obj.data.loops)
-                    uv_verts = np.zeros(nl * 2)
-                    uv_map.data.foreach_get("uv", uv_verts)
-                    uniqueUVs = np.unique(uv_verts.round(decimals=4))
-                    greater = np.any(np.greater(uniqueUVs, 1))
-                    if greater:
-                        uvOutOfBounds = True
-                        break
-                    less = np.any(np.less(uniqueUVs, 0))
-                    if less:
-                        uvOutOfBounds = True
-                        break
-                    break
-
-            if uvOutOfBounds:
+            unusableUVsReason = self.getUnusableUVsReason(obj)
+            if unusableUVsReason is not None:
                 if bakeSettings.generate_uvs == 'OFF':
                     raise Exception(
                         f"Object: '{obj.name}' has no usable UVs. Automatically generating UVs is disabled, so this object cannot be baked!")
 
-                msb_log("UVs are not in 0..1 range for baking, generating new UVs.")
+                msb_log("%s Generating new UVs.", unusableUVsReason)
                 generateUVs = True
 
         if generateUVs:
-            msb_log(f"Auto generating UVs for object: '{obj.name}'.")
+            msb_log("Auto generating UVs for object: '%s'.", obj.name)
 
             bakeUVLayer = obj.data.uv_layers.new(name="Baked")
             obj.data.uv_layers.active = bakeUVLayer
@@ -1049,22 +2848,53 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             # otherwise the baked images will use the wrong UVs!
             obj.data[UV_OVERRIDE] = bakeUVLayer.name
 
+            self.invalidateMeshCaches(obj.data)
+
             if context.object.mode == 'OBJECT':
                 bpy.ops.object.mode_set(mode='EDIT')
 
             bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='VERT')
             bpy.ops.mesh.select_all(action='SELECT')
             bpy.ops.mesh.select_linked(delimit={'SEAM'})
-            bpy.ops.uv.smart_project(island_margin=0.01, scale_to_bounds=True)
-            bpy.ops.uv.pack_islands(rotate=True, margin=0.001)
+            with self.trace.span("Generate UVs", object=obj.name):
+                bpy.ops.uv.smart_project(island_margin=0.01, scale_to_bounds=True)
+                bpy.ops.uv.pack_islands(rotate=True, margin=0.001)
 
         if UV_OVERRIDE in obj.data:
             obj.data.uv_layers.active = obj.data.uv_layers[obj.data[UV_OVERRIDE]]
         else:
             obj.data.uv_layers.active = obj.data.uv_layers[0]
 
-        if obj.mode == 'EDIT':
-            bpy.ops.object.mode_set(mode='OBJECT')
+        if obj.mode == 'EDIT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+    def getUnusableUVsReason(self, obj):
+        '''
+        :return: Why the active UVs of the object can't be used for baking or None if they can be used.
+        '''
+        # Even though there are UVs, they might not be useful for baking.
+        # Make sure they're not all in the same spot and in the 0..1 range:
+        # Note: This does not prevent overlapping UVs or faces with no area but that's up to the user to fix:
+        uv_map = obj.data.uv_layers.active
+        if uv_map is None or len(obj.data.loops) == 0:
+            return None
+
+        uvs = self.bufferPool.get("uvs", len(obj.data.loops) * 2)
+        uv_map.data.foreach_get("uv", uvs)
+        u = uvs[0::2]
+        v = uvs[1::2]
+        uMin, uMax, vMin, vMax = u.min(), u.max(), v.min(), v.max()
+
+        # Allow for rounding errors at the edges:
+        if uMin < -UV_BOUNDS_TOLERANCE or vMin < -UV_BOUNDS_TOLERANCE or \
+                uMax > 1 + UV_BOUNDS_TOLERANCE or vMax > 1 + UV_BOUNDS_TOLERANCE:
+            return "UVs are not in 0..1 range for baking."
+
+        # If every UV is in the same spot or on a line, nothing can be baked:
+        if uMax - uMin < UV_BOUNDS_TOLERANCE or vMax - vMin < UV_BOUNDS_TOLERANCE:
+            return "UVs have no area."
+
+        return None
 
     def getNodeYLocation(self, node):
         location = node.location[1]
@@ -1089,12 +2919,9 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             return mat
 
         # Use existing copy if there is one:
-        matCopyName = f"{mat.name}_{obj.name}_baked"
-
-        matCopyIndex = bpy.data.materials.find(matCopyName)
-        if matCopyIndex >= 0:
-            matCopy = bpy.data.materials[matCopyIndex]
-
+        bakedMaterialKey = self.getBakedMaterialKey(context, obj, mat)
+        matCopy = self.bakedMaterialCopies.get(bakedMaterialKey)
+        if matCopy is not None:
             # Replace material with its baking copy:
             matIndex = obj.material_slots.find(mat.name)
             obj.material_slots[matIndex].material = matCopy
@@ -1103,40 +2930,23 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
         # Make material copy for baking:
         mat.use_fake_user = True  # Make sure this does not get deleted when it's not referenced anymore
-        matCopy = mat.copy()
+        with self.trace.span("Copy material", object=obj.name, material=mat.name):
+            matCopy = mat.copy()
         matCopy[ORIGINAL_MATERIAL] = mat.name
-        matCopy.name = matCopyName
+        matCopy.name = self.getBakedMaterialName(context, obj, mat)
+        self.bakedMaterialCopies[bakedMaterialKey] = matCopy
 
         # Replace material with its baking copy:
         matIndex = obj.material_slots.find(mat.name)
         obj.material_slots[matIndex].material = matCopy
 
         # Ungroup all node groups for easy, error-free access:
+        with self.trace.span("Ungroup node groups", object=obj.name, material=mat.name):
+            msb_inlineNodeGroups(matCopy.node_tree)
         for node in matCopy.node_tree.nodes:
             node.select = False
 
-        # Need to set the context area type for the group_ungroup operator to work:
-        area = self.area
-        old_type = area.type
-        area.ui_type = 'ShaderNodeTree'
-
-        space = area.spaces.active
-        space.node_tree = matCopy.node_tree
-
-        for node in matCopy.node_tree.nodes:
-            if node.type == 'GROUP':
-                node.select = True
-                with context.temp_override(area=area):
-                    bpy.ops.node.group_ungroup()
-                node.select = False
-
-        for node in matCopy.node_tree.nodes:
-            node.select = False
-
-        # Restore context area type:
-        area.type = old_type
-
-        msb_log(f"Creating material copy '{mat.name}'->'{matCopy.name}'")
+        msb_log("Creating material copy '%s'->'%s'", mat.name, matCopy.name)
 
         # Use same BSDF type if we can bake its inputs,
         # otherwise connect the fallback baked maps to principled bsdf:
@@ -1189,6 +2999,7 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
         if prepareMaterial:
             mat = self.prepareMaterial(context, obj, bsdf, mat, canBakeBSDF)
+            self.invalidateRerouteTable(mat.node_tree)
 
         return mat
 
@@ -1202,13 +3013,18 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         if context.preferences.addons["cycles"].preferences.compute_device_type == "None":
             msb_log("The cycles render device is not set. Baking would be faster if this is set to CUDA, OptiX or HIP.")
 
-        self.setRestorableContextSetting(context, "scene.cycles.samples",
-                                         100)  # TODO: This could be a setting for the user to change
+        # The sample count is set for each bake type in 'setBakeSamples':
+        bakeSettings = context.scene.meshsync_bake_settings
+        self.setRestorableContextSetting(context, "scene.cycles.samples", bakeSettings.fallback_samples)
+        self.setRestorableContextSetting(context, "scene.cycles.use_adaptive_sampling",
+                                         bakeSettings.use_adaptive_sampling)
+        self.setRestorableContextSetting(context, "scene.cycles.adaptive_threshold", bakeSettings.adaptive_threshold)
 
         self.setRestorableContextSetting(context, "scene.render.bake.use_pass_direct", False)
         self.setRestorableContextSetting(context, "scene.render.bake.use_pass_indirect", False)
         self.setRestorableContextSetting(context, "scene.render.bake.use_pass_color", True)
         self.setRestorableContextSetting(context, "scene.render.bake.image_settings.file_format", 'PNG')
+        self.setRestorableContextSetting(context, "scene.render.image_settings.compression", bakeSettings.png_compression)
         self.setRestorableContextSetting(context, "scene.render.bake.use_selected_to_active", False)
         self.setRestorableContextSetting(context, "scene.render.bake.use_cage", False)
         self.setRestorableContextSetting(context, "scene.render.bake.normal_space", 'TANGENT')
@@ -1230,6 +3046,21 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         self.setRestorableContextSetting(context, "scene.cycles.transmission_bounces", 2)
         self.setRestorableContextSetting(context, "scene.cycles.volume_bounces", 0)
 
+    def getBakeSamples(self, context, bakeType):
+        '''
+        :return: Number of cycles samples to use for the given bake type.
+        '''
+        bakeSettings = context.scene.meshsync_bake_settings
+
+        if bakeType == 'EMIT':
+            return bakeSettings.emit_samples
+        if bakeType == 'AO':
+            return bakeSettings.ao_samples
+        return bakeSettings.fallback_samples
+
+    def setBakeSamples(self, context, bakeType):
+        context.scene.cycles.samples = self.getBakeSamples(context, bakeType)
+
     def setRestorableContextSetting(self, context, settingName, value):
         '''
         Allows to set nested settings and record their original value to restore them after baking.
@@ -1246,38 +3077,36 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         for originalSettingName, originalSettingValue in self.originalSceneSettings:
             msb_rsetattr(context, originalSettingName, originalSettingValue)
 
+    def getRerouteTable(self, node_tree):
+        key = node_tree.as_pointer()
+        table = self.rerouteTables.get(key)
+        if table is None:
+            table = RerouteTable(node_tree)
+            self.rerouteTables[key] = table
+        return table
+
+    def invalidateRerouteTable(self, node_tree):
+        '''
+        Needs to be called when nodes or links of the node tree were changed after traverseReroutes was used on it.
+        '''
+        self.rerouteTables.pop(node_tree.as_pointer(), None)
+
+    def getInputLink(self, socket):
+        '''
+        :return: The link connected to the input socket or None.
+        '''
+        return self.getRerouteTable(socket.id_data).getInputLink(socket)
+
     def traverseReroutes(self, nodeOrSocket):
         '''
         Goes upstream until it finds a node or node socket that is not a reroute node.
         :param nodeOrSocket: node or node socket
         :return: upstream input the node or node socket resolves to after reroutes
         '''
-
         if nodeOrSocket is None:
             return None
 
-        if isinstance(nodeOrSocket, bpy.types.NodeSocket):
-            isSocket = True
-            node = nodeOrSocket.node
-        else:
-            isSocket = False
-            node = nodeOrSocket
-
-        if node.mute:
-            return None
-
-        if node is None or node.type != 'REROUTE':
-            return nodeOrSocket
-
-        if len(node.inputs[0].links) == 0:
-            return None
-
-        if isSocket:
-            result = self.traverseReroutes(node.inputs[0].links[0].from_socket)
-        else:
-            result = self.traverseReroutes(node.inputs[0].links[0].from_node)
-
-        return result
+        return self.getRerouteTable(nodeOrSocket.id_data).resolve(nodeOrSocket)
 
     def canBsdfBeBaked(self, bsdf):
         if bsdf.type in ['EMISSION', 'SUBSURFACE_SCATTERING', 'EEVEE_SPECULAR']:
@@ -1285,12 +3114,11 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
         return 'bsdf' in bsdf.type.lower()
 
-    def bakeToImage(self, context, obj, mat, bsdf, bakeType, channel):
-        colorSpace = self.getChannelColourSpace(channel)
-
-        bakeImage = self.createImage(context, obj, f"{mat.name}_{channel.lower()}", colorSpace,
-                                     alpha=(colorSpace == 'sRGB'))
-
+    def createBakedImageNode(self, obj, mat, bsdf, bakeImage):
+        '''
+        Adds an image node for the baked image that uses the UV map the image is baked to.
+        :return: The new image node, it is the active node of the node tree.
+        '''
         node_tree = mat.node_tree
 
         # Set up image node
@@ -1307,17 +3135,223 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         node_tree.links.new(uvNode.outputs[0], bakedImageNode.inputs['Vector'])
         self.bakedImageNodeYOffset += 300
 
+        return bakedImageNode
+
+    def finishImageWrites(self):
+        '''
+        Waits for images that are written in the background.
+        '''
+        for filepath in self.imageWriter.finish():
+            fileName = os.path.basename(filepath)
+            self.bakeCache.pop(fileName, None)
+            self.removedBakeCacheEntries.add(fileName)
+
+    def getBakedImageExtension(self, context):
+        if context.scene.meshsync_bake_settings.baked_image_format == 'TARGA_RAW':
+            return ".tga"
+        return ".png"
+
+    def saveBakedImage(self, context, bakeImage, colorSpace, cacheKey=None, keepPixels=False):
+        '''
+        :param keepPixels: Keep the pixels for live sync even when the image is saved. The exporter needs them to send
+        single channels of packed textures.
+        '''
+        bakeSettings = context.scene.meshsync_bake_settings
+        fileName = bakeImage.name + self.getBakedImageExtension(context)
+        filepath = os.path.join(bakeSettings.bakedTexturesPath, fileName)
+
+        bakeImage.colorspace_settings.name = colorSpace
+
+        with self.trace.span("Read baked pixels", image=bakeImage.name):
+            pixels = msb_getImagePixels8Bit(bakeImage, self.bufferPool)
+
+        # Live sync needs the pixels until there is a file to send. Background workers don't sync at all:
+        writesFileLater = not bakeSettings.save_baked_images or bakeSettings.write_images_async
+        if (writesFileLater or keepPixels) and not bpy.app.background:
+            msb_registerBakedImage(bakeImage, pixels)
+
+        # Without a file there is nothing to reuse in the next bake:
+        if not bakeSettings.save_baked_images:
+            self.bakeCache.pop(fileName, None)
+            self.removedBakeCacheEntries.add(fileName)
+            return
+
+        if bakeSettings.write_images_async:
+            self.imageWriter.write(bakeImage, pixels, filepath, bakeSettings.baked_image_format,
+                                   bakeSettings.png_compression, keepPixels)
+        else:
+            with self.trace.span("Write image", image=fileName):
+                bakeImage.filepath_raw = filepath
+                bakeImage.file_format = bakeSettings.baked_image_format
+                bakeImage.save()
+                bakeImage.colorspace_settings.name = colorSpace
+
+        # Remember what the file was baked from so it can be reused:
+        if cacheKey is not None and context.scene.meshsync_bake_settings.use_bake_cache:
+            self.bakeCache[fileName] = cacheKey
+        else:
+            self.bakeCache.pop(fileName, None)
+            self.removedBakeCacheEntries.add(fileName)
+
+    def bakeToImage(self, context, obj, mat, bsdf, bakeType, channel):
+        colorSpace = self.getChannelColourSpace(channel)
+        imageName = self.getBakedImageName(context, obj, mat, channel)
+
+        sharedImageKey = self.getSharedBakedImageKey(context, obj, mat, channel)
+        if sharedImageKey in self.sharedBakedImages:
+            msb_log("%s was already baked for an object with the same mesh and material, reusing it.", channel)
+            return self.createBakedImageNode(obj, mat, bsdf, self.sharedBakedImages[sharedImageKey])
+
+        cacheKey = self.getBakeCacheKey(context, obj, mat, channel, bakeType)
+        if not self.isORMChannelPackingEnabled(context, channel):
+            cachedImage = self.loadCachedImage(context, imageName, cacheKey, colorSpace)
+            if cachedImage is not None:
+                if sharedImageKey is not None:
+                    self.sharedBakedImages[sharedImageKey] = cachedImage
+                return self.createBakedImageNode(obj, mat, bsdf, cachedImage)
+
+        bakeImage = self.createImage(context, obj, imageName, colorSpace,
+                                     alpha=(colorSpace == 'sRGB'))
+
+        bakedImageNode = self.createBakedImageNode(obj, mat, bsdf, bakeImage)
+
         # Bake
         msb_log("Baking in progress...")
-        bpy.ops.object.bake(type=bakeType, use_clear=True, use_selected_to_active=False, use_split_materials=True)
-        bakeImage.filepath_raw = os.path.join(context.scene.meshsync_bake_settings.bakedTexturesPath,
-                                              bakeImage.name + ".png")
-        bakeImage.file_format = "PNG"
-        bakeImage.save()
-        bakeImage.colorspace_settings.name = colorSpace
+        self.setBakeSamples(context, bakeType)
+        bakeStartTime = time.perf_counter()
+        with self.trace.span("Cycles bake", object=obj.name, material=mat.name, channel=channel, bakeType=bakeType):
+            bpy.ops.object.bake(type=bakeType, use_clear=True, use_selected_to_active=False, use_split_materials=True)
+        self.recordBakeDuration(context, obj, bakeType, bakeImage, time.perf_counter() - bakeStartTime)
+        if not self.isORMChannelPackingEnabled(context, channel):
+            self.saveBakedImage(context, bakeImage, colorSpace, cacheKey)
+
+        if sharedImageKey is not None:
+            self.sharedBakedImages[sharedImageKey] = bakeImage
 
         return bakedImageNode
 
+    def isORMChannelPackingEnabled(self, context, channel):
+        '''
+        True if the baked image of the channel is saved later as part of the ORM texture.
+        '''
+        return context.scene.meshsync_bake_settings.pack_orm_texture and channel in ORM_CHANNELS
+
+    def packORMTexture(self, context, obj, mat):
+        '''
+        Combines the baked AO, roughness and metallic images of the material into one ORM texture.
+        The images of these channels were not saved yet, if they cannot be packed they are saved individually.
+        '''
+        node_tree = mat.node_tree
+        bsdf = node_tree.nodes[mat[BAKED_MATERIAL_SHADER]]
+
+        # Find the baked image node for each channel, baked image nodes are selected:
+        channelImageNodes = []
+        for channel in ORM_CHANNELS:
+            imageNode = None
+            if channel == AO_CHANNEL_NAME:
+                imageNode = node_tree.nodes.get(BAKED_AO_IMAGE_NODE_NAME)
+            else:
+                inputName = self.getBSDFChannelInputName(bsdf, channel)
+                if inputName is not None and len(bsdf.inputs[inputName].links) > 0:
+                    linkedNode = bsdf.inputs[inputName].links[0].from_node
+                    if linkedNode.type == 'TEX_IMAGE' and linkedNode.select and linkedNode.image is not None:
+                        imageNode = linkedNode
+            channelImageNodes.append(imageNode)
+
+        bakedImageNodes = []
+        for imageNode in channelImageNodes:
+            if imageNode is not None and imageNode not in bakedImageNodes:
+                bakedImageNodes.append(imageNode)
+
+        if len(bakedImageNodes) == 0:
+            return
+
+        imageSize = tuple(bakedImageNodes[0].image.size)
+        canPack = len(bakedImageNodes) > 1 and all(tuple(x.image.size) == imageSize for x in bakedImageNodes)
+
+        if not canPack:
+            for imageNode in bakedImageNodes:
+                self.saveBakedImage(context, imageNode.image, imageNode.image.colorspace_settings.name)
+            return
+
+        msb_log(lambda: f"Packing baked {', '.join(c for c, n in zip(ORM_CHANNELS, channelImageNodes) if n is not None)} "
+                        f"of '{mat.name}' into one texture.")
+
+        numPixels = imageSize[0] * imageSize[1]
+        channelPixels = self.bufferPool.get("pixels", numPixels * 4)
+        ormPixels = self.bufferPool.get("packedPixels", numPixels * 4).reshape(-1, 4)
+        ormPixels.fill(1)
+
+        for index, (channel, imageNode) in enumerate(zip(ORM_CHANNELS, channelImageNodes)):
+            if imageNode is not None:
+                imageNode.image.pixels.foreach_get(channelPixels)
+                ormPixels[:, index] = channelPixels[0::4]
+            elif channel != AO_CHANNEL_NAME:
+                # Not used by the material but fill it with the value the material uses:
+                inputName = self.getBSDFChannelInputName(bsdf, channel)
+                if inputName is not None:
+                    value = self.getSocketConstantValue(bsdf.inputs[inputName])
+                    if value is not None:
+                        ormPixels[:, index] = value
+
+        ormImage = self.createImage(context, obj, f"{mat.name}_orm", 'Non-Color')
+        ormImage.pixels.foreach_set(ormPixels.ravel())
+        ormImage.update()
+
+        ormImageNode = self.createBakedImageNode(obj, mat, bsdf, ormImage)
+        ormImageNode.name = BAKED_ORM_IMAGE_NODE_NAME
+        self.saveBakedImage(context, ormImage, 'Non-Color', keepPixels=True)
+
+        # Separate RGB is deprecated since blender 3.3:
+        if hasattr(bpy.types, "ShaderNodeSeparateColor"):
+            separateNode = node_tree.nodes.new("ShaderNodeSeparateColor")
+        else:
+            separateNode = node_tree.nodes.new("ShaderNodeSeparateRGB")
+        separateNode.select = True
+        separateNode.location = (ormImageNode.location[0] + 300, ormImageNode.location[1])
+        node_tree.links.new(ormImageNode.outputs[0], separateNode.inputs[0])
+
+        for index, (channel, imageNode) in enumerate(zip(ORM_CHANNELS, channelImageNodes)):
+            if imageNode is not None and channel != AO_CHANNEL_NAME:
+                node_tree.links.new(separateNode.outputs[index], bsdf.inputs[self.getBSDFChannelInputName(bsdf, channel)])
+
+        # Remove the individual images unless they are still used by other channels:
+        for imageNode in bakedImageNodes:
+            if any(len(output.links) > 0 for output in imageNode.outputs):
+                self.saveBakedImage(context, imageNode.image, imageNode.image.colorspace_settings.name)
+                continue
+
+            image = imageNode.image
+            node_tree.nodes.remove(imageNode)
+            bpy.data.images.remove(image)
+
+    def getSocketConstantValue(self, socket):
+        '''
+        :return: The float value of the input socket, following links to value and RGB nodes.
+        None if the socket is linked to something that is not constant.
+        '''
+        value = socket.default_value
+        while socket.is_linked and not socket.links[0].is_muted:
+            link = socket.links[0]
+            node = link.from_node
+            if node.mute:
+                return None
+
+            if node.type == 'REROUTE':
+                socket = node.inputs[0]
+                continue
+
+            if node.type not in ['VALUE', 'RGB']:
+                return None
+
+            value = link.from_socket.default_value
+            break
+
+        # Colors are converted to floats by their luminance:
+        if hasattr(value, "__len__"):
+            return value[0] * 0.2126 + value[1] * 0.7152 + value[2] * 0.0722
+        return value
+
     def getChannelColourSpace(self, channel):
         if channel in ["Base Color", "Color"]:
             return 'sRGB'
@@ -1344,20 +3378,15 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             link(bsdf.outputs[0], matOutput.inputs[0])
             return self.bakeWithFallback(context, obj, mat, channel), None
 
-        if channel != DISPLACEMENT_CHANNEL_NAME:
-            bsdfChannelSocket = bsdf.inputs[bsdfChannelSocketName]
-        else:
-            displacementInput = matOutput.inputs['Displacement']
-            displacementInputNode = displacementInput.links[0].from_node
-            bsdfChannelSocket = displacementInputNode.inputs['Height']
+        bsdfChannelSocket = self.getChannelInputSocket(bsdf, matOutput, channel)
 
-        channelInput = self.traverseReroutes(bsdfChannelSocket.links[0].from_socket)
+        channelInput = self.traverseReroutes(self.getInputLink(bsdfChannelSocket).from_socket)
 
         if channelInput in self.objectBakeInfo:
-            msb_log(f"Input for channel {bsdfChannelSocketName} was already baked, reusing the same image.")
+            msb_log("Input for channel %s was already baked, reusing the same image.", bsdfChannelSocketName)
             return self.objectBakeInfo[channelInput], bsdfChannelSocket
 
-        msb_log(f"Baking inputs of channel: '{bsdfChannelSocket.name}'.")
+        msb_log("Baking inputs of channel: '%s'.", bsdfChannelSocket.name)
 
         link(channelInput, matOutput.inputs[0])
 
@@ -1367,6 +3396,172 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
         return bakedImageNode, bsdfChannelSocket
 
+    def getChannelInputSocket(self, bsdf, matOutput, channel):
+        '''
+        :return: The input socket whose upstream nodes are baked for the given channel.
+        '''
+        if channel != DISPLACEMENT_CHANNEL_NAME:
+            return bsdf.inputs[self.getBSDFChannelInputName(bsdf, channel)]
+
+        displacementInput = matOutput.inputs['Displacement']
+        displacementInputNode = displacementInput.links[0].from_node
+        return displacementInputNode.inputs['Height']
+
+    def getPackableChannels(self, context, obj, mat, bsdf, matOutput):
+        '''
+        :return: Enabled scalar channels that need baking and would be baked from their inputs as emission.
+        '''
+        canBakeBSDF = self.canBsdfBeBaked(bsdf)
+
+        result = []
+        for channel in SCALAR_CHANNELS:
+            if not self.isChannelBakeEnabled(context, channel):
+                continue
+
+            if channel != DISPLACEMENT_CHANNEL_NAME and (not canBakeBSDF or
+                                                         self.getBSDFChannelInputName(bsdf, channel) is None):
+                continue
+
+            if self.getPlannedBakeReason(context, obj, mat, bsdf, matOutput, channel) is not None:
+                result.append(channel)
+
+        return result
+
+    def bakePackedChannels(self, context, obj, mat, bsdf, matOutput, channels):
+        '''
+        Bakes the inputs of the given scalar channels with as few emission bakes as possible.
+        Up to 3 inputs are connected to the colour channels of one emission and baked together,
+        the result is split into one texture per channel afterwards.
+        :return: Material copy that uses the baked images
+        '''
+        mat = self.prepareBake(context, obj, bsdf, mat, True)
+
+        node_tree = mat.node_tree
+
+        # Make sure bsdf points to material copy:
+        bsdf = node_tree.nodes[bsdf.name]
+        matOutput = node_tree.nodes[matOutput.name]
+
+        # Channels that use the same input share one image:
+        channelSockets = {}
+        channelInputs = {}
+        inputsToBake = []
+        for channel in channels:
+            bsdfChannelSocket = self.getChannelInputSocket(bsdf, matOutput, channel)
+            channelInput = self.traverseReroutes(self.getInputLink(bsdfChannelSocket).from_socket)
+
+            channelSockets[channel] = bsdfChannelSocket
+            channelInputs[channel] = channelInput
+
+            if channelInput not in self.objectBakeInfo and channelInput not in [x[1] for x in inputsToBake]:
+                inputsToBake.append((channel, channelInput))
+
+        for i in range(0, len(inputsToBake), MAX_PACKED_CHANNELS):
+            inputs = inputsToBake[i:i + MAX_PACKED_CHANNELS]
+            for channel in channels:
+                if channelInputs[channel] in [x[1] for x in inputs]:
+                    self.incrementProgress(context, f"Baking '{mat.name}'->{channel} on '{obj.name}'",
+                                           self.getPlannedBakeCost(obj, mat, channel))
+
+            bakedImageNodes = self.bakePackedInputs(context, obj, mat, matOutput, inputs)
+            for (_, channelInput), bakedImageNode in zip(inputs, bakedImageNodes):
+                self.objectBakeInfo[channelInput] = bakedImageNode
+
+        for channel in channels:
+            self.connectBakedImage(mat, channel, self.objectBakeInfo[channelInputs[channel]], channelSockets[channel])
+
+        return mat
+
+    def bakePackedInputs(self, context, obj, mat, matOutput, inputs):
+        '''
+        Bakes up to 3 scalar inputs with one emission bake.
+        :param inputs: List of (channel, input socket) tuples
+        :return: Image nodes with the baked images, one for each input
+        '''
+        import numpy as np
+
+        node_tree = mat.node_tree
+        bakedBSDF = node_tree.nodes[mat[BAKED_MATERIAL_SHADER]]
+
+        # Skip the bake if all channels were baked for an object with the same mesh and material:
+        sharedImageKeys = [self.getSharedBakedImageKey(context, obj, mat, channel) for channel, _ in inputs]
+        if all(x in self.sharedBakedImages for x in sharedImageKeys):
+            msb_log(lambda: f"{', '.join(x[0] for x in inputs)} were already baked for an object with the same mesh "
+                            f"and material, reusing them.")
+            return [self.createBakedImageNode(obj, mat, bakedBSDF, self.sharedBakedImages[x]) for x in sharedImageKeys]
+
+        # Skip the bake if all channels were baked before with the same inputs:
+        cacheKeys = [self.getBakeCacheKey(context, obj, mat, channel, 'EMIT') for channel, _ in inputs]
+        if not any(self.isORMChannelPackingEnabled(context, channel) for channel, _ in inputs):
+            cachedImages = [self.loadCachedImage(context, self.getBakedImageName(context, obj, mat, channel), cacheKey,
+                                                 self.getChannelColourSpace(channel))
+                            for (channel, _), cacheKey in zip(inputs, cacheKeys)]
+            if all(x is not None for x in cachedImages):
+                for sharedImageKey, cachedImage in zip(sharedImageKeys, cachedImages):
+                    if sharedImageKey is not None:
+                        self.sharedBakedImages[sharedImageKey] = cachedImage
+                return [self.createBakedImageNode(obj, mat, bakedBSDF, x) for x in cachedImages]
+
+        # Combine RGB is deprecated since blender 3.3:
+        if hasattr(bpy.types, "ShaderNodeCombineColor"):
+            combineNode = node_tree.nodes.new("ShaderNodeCombineColor")
+        else:
+            combineNode = node_tree.nodes.new("ShaderNodeCombineRGB")
+
+        for index, (_, channelInput) in enumerate(inputs):
+            node_tree.links.new(channelInput, combineNode.inputs[index])
+
+        node_tree.links.new(combineNode.outputs[0], matOutput.inputs[0])
+
+        packedImage = self.createImage(context, obj, f"{mat.name}_packed", 'Non-Color')
+        packedImageNode = node_tree.nodes.new("ShaderNodeTexImage")
+        packedImageNode.image = packedImage
+        node_tree.nodes.active = packedImageNode
+
+        msb_log(lambda: f"Baking {', '.join(x[0] for x in inputs)} in one pass...")
+        self.setBakeSamples(context, 'EMIT')
+        bakeStartTime = time.perf_counter()
+        with self.trace.span("Cycles bake", object=obj.name, material=mat.name,
+                             channel=", ".join(x[0] for x in inputs), bakeType='EMIT'):
+            bpy.ops.object.bake(type='EMIT', use_clear=True, use_selected_to_active=False, use_split_materials=True)
+
+        # Record the duration per map so it can be compared to maps baked on their own:
+        self.recordBakeDuration(context, obj, 'EMIT', packedImage, (time.perf_counter() - bakeStartTime) / len(inputs))
+
+        packedPixels = self.bufferPool.get("packedPixels", len(packedImage.pixels))
+        packedImage.pixels.foreach_get(packedPixels)
+        packedPixels = packedPixels.reshape(-1, 4)
+
+        node_tree.nodes.remove(packedImageNode)
+        node_tree.nodes.remove(combineNode)
+        bpy.data.images.remove(packedImage)
+
+        # Write each colour channel of the bake into its own greyscale image.
+        # saveBakedImage reads pixels into the "pixels" buffer, this needs its own so the alpha stays filled:
+        channelPixels = self.bufferPool.get("packedChannel", packedPixels.size).reshape(-1, 4)
+        channelPixels.fill(1)
+        bakedImageNodes = []
+        for index, ((channel, _), cacheKey, sharedImageKey) in enumerate(zip(inputs, cacheKeys, sharedImageKeys)):
+            # Creating the image again would remove it from the material of the object it was baked for:
+            if sharedImageKey in self.sharedBakedImages:
+                bakedImageNodes.append(self.createBakedImageNode(obj, mat, bakedBSDF, self.sharedBakedImages[sharedImageKey]))
+                continue
+
+            colorSpace = self.getChannelColourSpace(channel)
+            bakeImage = self.createImage(context, obj, self.getBakedImageName(context, obj, mat, channel), colorSpace)
+
+            channelPixels[:, :3] = packedPixels[:, index, np.newaxis]
+            bakeImage.pixels.foreach_set(channelPixels.ravel())
+            bakeImage.update()
+
+            bakedImageNodes.append(self.createBakedImageNode(obj, mat, bakedBSDF, bakeImage))
+            if not self.isORMChannelPackingEnabled(context, channel):
+                self.saveBakedImage(context, bakeImage, colorSpace, cacheKey)
+            if sharedImageKey is not None:
+                self.sharedBakedImages[sharedImageKey] = bakeImage
+
+        return bakedImageNodes
+
     def bakeWithFallback(self, context, obj, mat, channel):
         '''
         Does default blender bake of the given channel.
@@ -1375,11 +3570,11 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         if channel in channelNameToBakeName:
             bakeType = channelNameToBakeName[channel]
         else:
-            msb_log(
-                f"Unable to bake {channel} for {mat.name} on {obj.name}. The channel is not supported in fallback mode.\n")
+            msb_log("Unable to bake %s for %s on %s. The channel is not supported in fallback mode.\n",
+                    channel, mat.name, obj.name)
             return None
 
-        msb_log(f"Baking {channel} in fallback mode as {bakeType}")
+        msb_log("Baking %s in fallback mode as %s", channel, bakeType)
 
         node_tree = mat.node_tree
         bsdf = node_tree.nodes[mat[BAKED_MATERIAL_SHADER]]
@@ -1409,7 +3604,8 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         return None
 
     def bakeChannel(self, context, obj, mat, bsdf, matOutput, channel):
-        self.incrementProgress(context, f"Baking '{mat.name}'->{channel} on '{obj.name}'", obj)
+        self.incrementProgress(context, f"Baking '{mat.name}'->{channel} on '{obj.name}'",
+                               self.getPlannedBakeCost(obj, mat, channel))
 
         canBakeBSDF = self.canBsdfBeBaked(bsdf)
 
@@ -1420,7 +3616,7 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         # AO cannot be baked from inputs:
         if channel == AO_CHANNEL_NAME:
             bakedImageNode = self.bakeWithFallback(context, obj, mat, channel)
-            bakedImageNode.name = "BAKED_AO"
+            bakedImageNode.name = BAKED_AO_IMAGE_NODE_NAME
         elif channel == DISPLACEMENT_CHANNEL_NAME:
             bakedImageNode, bsdfChannelSocket = self.bakeChannelInputsDirectly(context, obj, mat, bsdf, matOutput, channel)
         else:
@@ -1433,6 +3629,11 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         if not bakedImageNode:
             return mat
 
+        self.connectBakedImage(mat, channel, bakedImageNode, bsdfChannelSocket)
+
+        return mat
+
+    def connectBakedImage(self, mat, channel, bakedImageNode, bsdfChannelSocket):
         # Connect baked image to baked bsdf node:
         node_tree = mat.node_tree
         bsdf = node_tree.nodes[mat[BAKED_MATERIAL_SHADER]]
@@ -1453,19 +3654,68 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
             else:
                 node_tree.links.new(bakedImageNode.outputs[0], bsdf.inputs[inputChannelName])
 
-        return mat
-
     def execute(self, context):
         self.startTime = time.time()
         self.context = context
-        self.bakeTask = self.bake()
+        self.workerProcesses = []
+        self.costModel = BakeCostModel(msb_getBakeHistoryPath())
+        self.trace = msb_createBakeTrace(context)
+
+        # Reroute resolution by node tree pointer, built once per node tree:
+        self.rerouteTables = {}
+        # Whether the node tree of each material reads the object it is used on:
+        self.objectDependentMaterials = {}
+
+        if context.scene.meshsync_bake_settings.bake_processes > 1:
+            self.bakeTask = self.bakeInWorkers()
+        else:
+            self.bakeTask = self.bake()
+
+        # There are no modal callbacks in background mode or without invoke (e.g. from msb_bake or scripts),
+        # bake everything right away:
+        if bpy.app.background or not getattr(self, "isModal", False):
+            for _ in self.bakeTask:
+                pass
+
+            msb_log("Finished baking. Time taken: %s",
+                    datetime.timedelta(seconds=(time.time() - self.startTime)), level=LogLevel.ERROR)
+            return {'FINISHED'}
 
         return {'RUNNING_MODAL'}
 
+    def runBakeTask(self, timeBudget=None):
+        '''
+        Runs steps of the bake task until the time budget is used up.
+        Steps that run a cycles bake always start a new modal update, so they don't add to the time of other steps.
+        :param timeBudget: Seconds to run steps for or None to only stop when the UI needs to be redrawn
+        :return: True if the bake task is finished
+        '''
+        startTime = time.perf_counter()
+        for step in self.bakeTask:
+            if step == REDRAW_STEP:
+                return False
+            if timeBudget is None:
+                continue
+            if step == BAKE_STEP or time.perf_counter() - startTime >= timeBudget:
+                return False
+
+        return True
+
     def stop(self, context):
         wm = context.window_manager
         wm.event_timer_remove(self.timer)
 
+        # Don't leave files half written when baking is cancelled:
+        if getattr(self, "imageWriter", None) is not None:
+            self.imageWriter.finish()
+
+        # Measurements of cancelled bakes are still valid:
+        self.costModel.save()
+        self.trace.save()
+
+        # Lets the bake task clean up, e.g. restore render settings, stop worker processes and delete their files:
+        self.bakeTask.close()
+
     def invoke(self, context, event):
 
         if not os.access(context.scene.meshsync_bake_settings.bakedTexturesPath, os.W_OK):
@@ -1475,9 +3725,7 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
         wm = context.window_manager
         self.timer = wm.event_timer_add(0, window=context.window)
         context.window_manager.modal_handler_add(self)
-
-        # Store area for later use, these won't exist on modal timer callbacks:
-        self.area = context.area
+        self.isModal = True
 
         return self.execute(context)
 
@@ -1490,16 +3738,201 @@ class MESHSYNC_OT_Bake(bpy.types.Operator):
 
         # Refresh context each run:
         self.context = context
-        for _ in self.bakeTask:
+        timeBudget = MODAL_TIME_BUDGET if context.scene.meshsync_bake_settings.run_modal else None
+        finished = self.runBakeTask(timeBudget)
+
+        # Show the progress:
+        if context.screen is not None:
+            for area in context.screen.areas:
+                area.tag_redraw()
+
+        if not finished:
             return {'RUNNING_MODAL'}
 
-        msb_log(f"Finished baking. Time taken: {datetime.timedelta(seconds=(time.time() - self.startTime))}",
-                LogLevel.ERROR)
+        msb_log("Finished baking. Time taken: %s",
+                datetime.timedelta(seconds=(time.time() - self.startTime)), level=LogLevel.ERROR)
 
         self.stop(context)
         return {'FINISHED'}
 
 
+class MESHSYNC_OT_PlanBake(MESHSYNC_OT_Bake):
+    '''
+    Works out what baking would do without changing anything in the file.
+    '''
+    bl_idname = "meshsync.plan_bake"
+    bl_label = "Plan bake"
+    bl_description = "Lists the textures that baking would create with their sizes and sample counts without baking anything"
+
+    object_names: bpy.props.StringProperty(name="Object names",
+                                           description="JSON list of names of objects to plan instead of the objects set in the bake settings",
+                                           options={'HIDDEN', 'SKIP_SAVE'})
+    filepath: bpy.props.StringProperty(name="File path",
+                                       description="JSON file to write the plan to",
+                                       subtype='FILE_PATH',
+                                       options={'SKIP_SAVE'})
+
+    def wouldGenerateUVs(self, context, obj):
+        '''
+        :return: True if prepareObjectForBaking would generate new UVs for the object.
+        '''
+        bakeSettings = context.scene.meshsync_bake_settings
+
+        if bakeSettings.generate_uvs == 'ALWAYS' or UV_OVERRIDE in obj.data:
+            return True
+        if len(obj.data.uv_layers) == 0:
+            return bakeSettings.generate_uvs != 'OFF'
+
+        return bakeSettings.generate_uvs != 'OFF' and self.getUnusableUVsReason(obj) is not None
+
+    def planObject(self, context, obj):
+        bakeSettings = context.scene.meshsync_bake_settings
+
+        generateUVs = self.wouldGenerateUVs(context, obj)
+        if bakeSettings.baked_texture_dimensions == 'PIXELS':
+            width, height = bakeSettings.bakedTextureSize
+        elif generateUVs or obj.data.uv_layers.active is None:
+            # The UVs don't exist yet, this is the largest it could be:
+            width = height = bakeSettings.texel_density_limit
+        else:
+            width, height = self.getTextureDimensions(context, obj)
+
+        objectPlan = {"name": obj.name,
+                      "mesh": obj.data.name,
+                      "polygons": len(obj.data.polygons),
+                      "applyModifiers": bakeSettings.apply_modifiers and len(obj.modifiers) > 0,
+                      "generateUVs": generateUVs,
+                      "materials": []}
+
+        plannedMaterials = set()
+        for matSlot in obj.material_slots:
+            mat = matSlot.material
+            if mat in plannedMaterials or not self.canMaterialBeBaked(mat):
+                continue
+            plannedMaterials.add(mat)
+
+            # Baked together with another object that has the same mesh:
+            bakedMaterialKey = self.getBakedMaterialKey(context, obj, mat)
+            if bakedMaterialKey in self.plannedBakedMaterials:
+                continue
+            self.plannedBakedMaterials.add(bakedMaterialKey)
+
+            matOutput, bsdf = self.findMaterialOutputNodeAndInput(mat)
+            if matOutput is None or bsdf is None:
+                continue
+
+            # Check image inputs against the UVs that would be generated without generating them:
+            plan = self.planMaterialBake(context, obj, bsdf, matOutput, newUVs=generateUVs)
+
+            packedChannels = []
+            if bakeSettings.pack_scalar_bakes and self.canBsdfBeBaked(bsdf):
+                packedChannels = [x for x in SCALAR_CHANNELS if x in plan and
+                                  (x == DISPLACEMENT_CHANNEL_NAME or self.getBSDFChannelInputName(bsdf, x) is not None)]
+                if len(packedChannels) < 2:
+                    packedChannels = []
+
+            maps = []
+            for channel, reason in plan.items():
+                bakeType = self.getPlannedBakeType(bsdf, channel)
+                if bakeType is None:
+                    continue
+
+                # Baked together with another object that has the same mesh, only its AO is baked separately:
+                sharedImageKey = self.getSharedBakedImageKey(context, obj, mat, channel)
+                if sharedImageKey is not None:
+                    if sharedImageKey in self.plannedSharedImages:
+                        continue
+                    self.plannedSharedImages.add(sharedImageKey)
+
+                maps.append({"channel": channel,
+                             "reason": reason,
+                             "bakeType": bakeType,
+                             "image": self.getBakedImageName(context, obj, mat, channel).replace(" ", "_") +
+                                      self.getBakedImageExtension(context),
+                             "width": width,
+                             "height": height,
+                             "pixels": width * height,
+                             "samples": self.getBakeSamples(context, bakeType),
+                             "estimatedSeconds": round(self.predictBakeCost(context, obj, bsdf, channel, (width, height)), 1),
+                             "packed": channel in packedChannels})
+
+            if len(maps) == 0:
+                continue
+
+            packedMaps = sum(1 for x in maps if x["packed"])
+            objectPlan["materials"].append({"name": mat.name,
+                                            "maps": maps,
+                                            "passes": len(maps) - packedMaps +
+                                                      math.ceil(packedMaps / MAX_PACKED_CHANNELS)})
+
+        return objectPlan
+
+    def createPlan(self, context):
+        bakeSettings = context.scene.meshsync_bake_settings
+
+        self.textureDimensionsCache = {}
+        self.meshHashCache = {}
+        self.bakePlan = {}
+        self.bufferPool = BakeBufferPool()
+        self.plannedBakedMaterials = set()
+        self.plannedSharedImages = set()
+        self.costModel = BakeCostModel(msb_getBakeHistoryPath())
+        self.trace = BakeTraceDisabled()
+        self.rerouteTables = {}
+        self.objectDependentMaterials = {}
+
+        objectsToBake = self.getObjectsToBake(context) or []
+        objectPlans = [self.planObject(context, obj) for obj in objectsToBake if msb_canObjectMaterialsBeBaked(obj)]
+        objectPlans = [x for x in objectPlans if len(x["materials"]) > 0]
+
+        maps = [x for objectPlan in objectPlans for materialPlan in objectPlan["materials"] for x in materialPlan["maps"]]
+
+        return {"file": bpy.data.filepath,
+                "bakedTexturesPath": bakeSettings.bakedTexturesPath,
+                "objects": objectPlans,
+                "totals": {"objects": len(objectPlans),
+                           "maps": len(maps),
+                           "passes": sum(materialPlan["passes"] for objectPlan in objectPlans
+                                         for materialPlan in objectPlan["materials"]),
+                           "pixels": sum(x["pixels"] for x in maps),
+                           # Rough measure of the bake cost that can be compared between plans:
+                           "samplePixels": sum(x["pixels"] * x["samples"] for x in maps),
+                           "estimatedSeconds": round(sum(x["estimatedSeconds"] for x in maps), 1)}}
+
+    def execute(self, context):
+        global msb_lastBakePlan
+
+        self.context = context
+        msb_lastBakePlan = self.createPlan(context)
+
+        totals = msb_lastBakePlan["totals"]
+        msb_log("Baking would create %s textures for %s objects in %s bake passes (%s pixels). Estimated time: %s",
+                totals['maps'], totals['objects'], totals['passes'], totals['pixels'],
+                datetime.timedelta(seconds=int(totals['estimatedSeconds'])), level=LogLevel.NORMAL)
+
+        if len(self.filepath) > 0:
+            with open(bpy.path.abspath(self.filepath), "w") as f:
+                json.dump(msb_lastBakePlan, f, indent=1)
+            msb_log("Bake plan written to '%s'.", self.filepath, level=LogLevel.NORMAL)
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return self.execute(context)
+
+
+def msb_planBake(objectNames=None, filepath=""):
+    '''
+    Works out which textures baking would create with the current bake settings without baking anything.
+    :param objectNames: Names of the objects to plan, None to use the objects set in the bake settings
+    :param filepath: Optional JSON file to write the plan to
+    :return: The plan as a dictionary
+    '''
+    bpy.ops.meshsync.plan_bake(object_names=json.dumps(objectNames) if objectNames is not None else "",
+                               filepath=filepath)
+    return msb_lastBakePlan
+
+
 class MESHSYNC_OT_select_bake_folder(bpy.types.Operator, ExportHelper):
     bl_idname = "meshsync.choose_material_bake_folder"
     bl_label = "Choose folder for baked textures"
@@ -1525,9 +3958,8 @@ def msb_revertBakedMaterials(obj):
         if ORIGINAL_MATERIAL in mat:
             origMatName = mat[ORIGINAL_MATERIAL]
             if origMatName not in bpy.data.materials:
-                msb_log(
-                    f"Cannot revert bake for material '{mat.name}' on '{obj.name}'. Original material '{origMatName}' does not exist.",
-                    LogLevel.ERROR)
+                msb_log("Cannot revert bake for material '%s' on '%s'. Original material '%s' does not exist.",
+                        mat.name, obj.name, origMatName, level=LogLevel.ERROR)
                 continue
 
             origMat = bpy.data.materials[origMatName]
@@ -1535,9 +3967,141 @@ def msb_revertBakedMaterials(obj):
             materialsToDelete.add(mat)
 
     for mat in materialsToDelete:
+        # Baked materials can be shared by objects with the same mesh, keep it until the last one is reverted:
+        if mat.users - (1 if mat.use_fake_user else 0) > 0:
+            continue
+
+        if mat.node_tree is not None:
+            for node in mat.node_tree.nodes:
+                if node.type == 'TEX_IMAGE' and node.image is not None:
+                    msb_unregisterBakedImage(node.image.name)
+
         bpy.data.materials.remove(mat)
 
 
+def msb_runBakeWorker(jobPath):
+    '''
+    Entry point of the background blender processes started to bake in parallel.
+    Bakes the objects of the job and saves the baked meshes and materials so they can be merged back.
+    '''
+    with open(jobPath) as f:
+        job = json.load(f)
+
+    scene = bpy.context.scene
+    scene.meshsync_bake_settings.bake_processes = 1
+    # The baked images are loaded from their files when the results are merged:
+    scene.meshsync_bake_settings.save_baked_images = True
+    scene.render.threads_mode = 'FIXED'
+    scene.render.threads = job["threads"]
+    scene.meshsync_bake_settings.trace_file = job["trace"]
+
+    bpy.ops.meshsync.bake_materials(object_names=json.dumps(job["objects"]))
+
+    manifest = {}
+    for name in job["objects"]:
+        obj = bpy.data.objects.get(name)
+        if obj is None or not msb_canObjectMaterialsBeBaked(obj):
+            continue
+
+        manifest[name] = {
+            "mesh": obj.data.name,
+            "materials": [x.material.name if x.material is not None else None for x in obj.material_slots],
+            "bakedMaterials": [x.material.name for x in obj.material_slots
+                               if x.material is not None and ORIGINAL_MATERIAL in x.material],
+            "modifiers": [mod.name for mod in obj.modifiers]
+        }
+
+    # Baked materials are merged separately, clear the slots so merging the meshes does not duplicate the original materials:
+    for name in manifest:
+        for matSlot in bpy.data.objects[name].material_slots:
+            if matSlot.material is not None:
+                matSlot.material.use_fake_user = True
+                matSlot.material = None
+
+    bpy.ops.wm.save_as_mainfile(filepath=job["output"], copy=True)
+
+    with open(job["manifest"], "w") as f:
+        json.dump(manifest, f)
+
+
+def msb_bake(objectNames=None, bakedTexturesPath=None, channels=None, savePath=None, **settings):
+    '''
+    Bakes materials without the UI, for example in 'blender -b'.
+    :param objectNames: Names of the objects to bake, None to bake the objects set in the bake settings
+    :param bakedTexturesPath: Folder to save the baked textures to, None to use the bake settings
+    :param channels: Names of the channels to bake, None to bake the channels enabled in the bake settings
+    :param savePath: Saves the blend file to this path after baking if it is set
+    :param settings: Any other bake setting, e.g. baked_texture_dimensions='TEXEL_DENSITY'
+    :return: Result of the bake operator, it is finished when this returns
+    '''
+    bakeSettings = bpy.context.scene.meshsync_bake_settings
+    msb_initializeBakeSettings(bakeSettings)
+
+    if bakedTexturesPath is not None:
+        bakeSettings.bakedTexturesPath = bakedTexturesPath
+
+    if not os.access(bakeSettings.bakedTexturesPath, os.W_OK):
+        raise Exception(f"The folder to save baked textures to does not exist: '{bakeSettings.bakedTexturesPath}'")
+
+    if channels is not None:
+        unknownChannels = [x for x in channels if x not in BAKED_CHANNELS]
+        if len(unknownChannels) > 0:
+            raise Exception(f"Unknown channels: {unknownChannels}. Valid channels are: {BAKED_CHANNELS}")
+
+        for channelSetting in bakeSettings.bake_channel_settings:
+            channelSetting.bakeChannelEnabled = channelSetting.name in channels
+
+    for name, value in settings.items():
+        if name not in bakeSettings.bl_rna.properties.keys():
+            raise Exception(f"Unknown bake setting: '{name}'")
+        setattr(bakeSettings, name, value)
+
+    result = bpy.ops.meshsync.bake_materials(object_names=json.dumps(objectNames) if objectNames is not None else "")
+
+    if savePath is not None:
+        bpy.ops.wm.save_as_mainfile(filepath=savePath)
+
+    return result
+
+
+def msb_bakeFromCommandLine(argv=None):
+    '''
+    Bakes with the arguments given after '--' on the command line, for example:
+    blender -b scene.blend --python-expr "import <addon>.unity_mesh_sync_baking as b; b.msb_bakeFromCommandLine()" -- --output /textures --save /baked.blend
+    '''
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(prog="meshsync bake", description="Bakes materials to textures with MeshSync.")
+    parser.add_argument("--objects", nargs="+", help="Names of the objects to bake")
+    parser.add_argument("--output", help="Folder to save the baked textures to")
+    parser.add_argument("--channels", nargs="+", help=f"Channels to bake: {', '.join(BAKED_CHANNELS)}")
+    parser.add_argument("--save", help="Path to save the blend file to after baking")
+    parser.add_argument("--setting", action="append", default=[], metavar="NAME=VALUE",
+                        help="Bake setting to change, e.g. texel_density=1024. Values are parsed as JSON if possible.")
+    parser.add_argument("--log-file", help="File to write the bake log to in addition to the console")
+    parser.add_argument("--log-level", choices=["VERBOSE", "NORMAL", "ERROR"], help="Lowest level of messages to log")
+    args = parser.parse_args(argv)
+
+    if args.log_level is not None:
+        msb_setLogLevel(getattr(LogLevel, args.log_level))
+    if args.log_file is not None:
+        handler = logging.FileHandler(args.log_file)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        msb_logger.addHandler(handler)
+
+    settings = {}
+    for setting in args.setting:
+        name, _, value = setting.partition("=")
+        try:
+            settings[name] = json.loads(value)
+        except ValueError:
+            settings[name] = value
+
+    return msb_bake(objectNames=args.objects, bakedTexturesPath=args.output, channels=args.channels,
+                    savePath=args.save, **settings)
+
+
 class MESHSYNC_OT_RevertBake(bpy.types.Operator):
     bl_idname = "meshsync.revert_bake_materials"
     bl_label = "Restore original materials"
@@ -1555,5 +4119,6 @@ class MESHSYNC_OT_RevertBake(bpy.types.Operator):
 
         for obj in context.scene.objects:
             msb_revertBakedMaterials(obj)
+            msb_bakeStamps.pop(obj.name_full, None)
 
         return {'FINISHED'}
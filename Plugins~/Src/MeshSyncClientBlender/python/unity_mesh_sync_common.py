@@ -140,6 +140,9 @@ def msb_initialize_properties():
 @persistent
 def on_scene_load(context):
     msb_context.clear()
+    # Clearing the context removes the pixels the exporter needs for packed baked textures:
+    from .unity_mesh_sync_baking import msb_registerPackedBakedImages
+    msb_registerPackedBakedImages()
 
 
 @persistent
@@ -235,12 +238,13 @@ class MESHSYNC_PT:
     bl_region_type = "UI"
     bl_category = "Tool"
 
-from .unity_mesh_sync_baking import MESHSYNC_OT_select_bake_folder, MESHSYNC_OT_Bake, MESHSYNC_OT_RevertBake, MESHSYNC_BakeSettings, MESHSYNC_BakeChannelSetting
+from .unity_mesh_sync_baking import MESHSYNC_OT_select_bake_folder, MESHSYNC_OT_Bake, MESHSYNC_OT_PlanBake, MESHSYNC_OT_RevertBake, MESHSYNC_BakeSettings, MESHSYNC_BakeChannelSetting
 
 sharedClasses = [MESHSYNC_BakeChannelSetting,
                  MESHSYNC_BakeSettings,
                  MESHSYNC_OT_select_bake_folder,
                  MESHSYNC_OT_Bake,
+                 MESHSYNC_OT_PlanBake,
                  MESHSYNC_OT_RevertBake,
                  MESHSYNC_OT_SendObjects,
                  MESHSYNC_OT_SendSelectedObjects]